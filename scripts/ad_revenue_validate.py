@@ -3,6 +3,7 @@ from __future__ import annotations
 import argparse
 import csv
 import datetime as dt
+from dataclasses import dataclass
 from pathlib import Path
 
 if __package__ in {None, ""}:  # pragma: no cover
@@ -10,54 +11,87 @@ if __package__ in {None, ""}:  # pragma: no cover
 
     sys.path.append(str(Path(__file__).resolve().parent.parent))
 
-from scripts.common import dump_json, resolve_path
+from scripts.common import dump_json, parse_iso_date, resolve_path
 
 AD_REVENUE_COLUMNS = ["date", "adsense_revenue_usd", "source", "note"]
 
 
+@dataclass(slots=True)
+class AdRevenueRow:
+    day: dt.date
+    revenue_usd: float
+    source: str
+    note: str
+
+
 def _parse_day(value: str) -> dt.date:
     try:
-        return dt.date.fromisoformat((value or "").strip())
+        return parse_iso_date(value or "")
     except ValueError as exc:
         raise ValueError(f"invalid date: {value}") from exc
 
 
-def _parse_non_negative_float(value: str) -> float:
+def _parse_float(value: str) -> float:
     try:
-        num = float((value or "").strip())
+        return float((value or "").strip())
     except ValueError as exc:
         raise ValueError(f"invalid float: {value}") from exc
-    if num < 0:
-        raise ValueError(f"negative revenue is not allowed: {value}")
-    return num
 
 
-def read_rows(path: Path) -> list[dict[str, str]]:
+def read_rows(path: Path) -> list[AdRevenueRow]:
     if not path.exists():
         raise ValueError(f"{path} does not exist")
+    rows: list[AdRevenueRow] = []
+    negative_lines: list[str] = []
     with path.open("r", encoding="utf-8", newline="") as fh:
-        reader = csv.DictReader(fh)
-        headers = reader.fieldnames or []
+        reader = csv.reader(fh)
+        headers = next(reader, [])
         missing = [col for col in AD_REVENUE_COLUMNS if col not in headers]
         if missing:
             raise ValueError(f"{path} is missing required columns: {', '.join(missing)}")
-        rows = [dict(row) for row in reader]
-    for idx, row in enumerate(rows, start=2):
-        _parse_day(row.get("date", ""))
-        _parse_non_negative_float(row.get("adsense_revenue_usd", "0"))
-        for col in ("source", "note"):
-            row[col] = (row.get(col, "") or "").strip()
+        date_idx, revenue_idx, source_idx, note_idx = (
+            headers.index(col) for col in AD_REVENUE_COLUMNS
+        )
+        width = len(headers)
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < width:
+                row = row + [""] * (width - len(row))
+            revenue = _parse_float(row[revenue_idx])
+            if revenue < 0:
+                negative_lines.append(str(reader.line_num))
+            rows.append(
+                AdRevenueRow(
+                    day=_parse_day(row[date_idx]),
+                    revenue_usd=revenue,
+                    source=row[source_idx].strip(),
+                    note=row[note_idx].strip(),
+                )
+            )
+    if negative_lines:
+        raise ValueError(
+            f"{path} has negative revenue (not allowed) on line(s): {', '.join(negative_lines)}"
+        )
     return rows
 
 
 def sum_ad_revenue(path: Path, start_day: dt.date, end_day: dt.date) -> float:
-    rows = read_rows(path)
-    total = 0.0
+    return sum(
+        (row.revenue_usd for row in read_rows(path) if start_day <= row.day <= end_day),
+        0.0,
+    )
+
+
+def sum_ad_revenue_windows(
+    rows: list[AdRevenueRow], windows: list[tuple[dt.date, dt.date]]
+) -> list[float]:
+    totals = [0.0] * len(windows)
     for row in rows:
-        day = _parse_day(row.get("date", ""))
-        if start_day <= day <= end_day:
-            total += _parse_non_negative_float(row.get("adsense_revenue_usd", "0"))
-    return total
+        for index, (start_day, end_day) in enumerate(windows):
+            if start_day <= row.day <= end_day:
+                totals[index] += row.revenue_usd
+    return totals
 
 
 def cli() -> int:
@@ -67,7 +101,7 @@ def cli() -> int:
 
     path = resolve_path(args.file)
     rows = read_rows(path)
-    total = sum(_parse_non_negative_float(row.get("adsense_revenue_usd", "0")) for row in rows)
+    total = sum((row.revenue_usd for row in rows), 0.0)
     print(
         dump_json(
             {
@@ -1,30 +1,80 @@
 from __future__ import annotations
 
+import copy
 import csv
 import datetime as dt
+import functools
 import hashlib
 import json
+import os
 import re
+import threading
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Iterator
 
 import yaml
 
+if TYPE_CHECKING:
+    import requests
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover - libyaml not available
+    from yaml import SafeLoader as _YamlLoader
+
 ROOT_DIR = Path(__file__).resolve().parent.parent
+METRICS_COLUMNS = ["date", "pv", "clicks"]
+SLUG_SPACE_PATTERN = re.compile(r"\s+")
+SLUG_INVALID_PATTERN = re.compile(r"[^a-z0-9\-]")
+SLUG_DASH_PATTERN = re.compile(r"-+")
+AFFILIATE_READY_STATUSES = frozenset({"approved", "active", "affiliate_ready"})
+GA4_MEASUREMENT_PATTERN = re.compile(r"G-[A-Z0-9]+")
+ADSENSE_PUBLISHER_PATTERN = re.compile(r"ca-pub-\d{16}")
+PLACEHOLDER_URL_PATTERN = re.compile(r"example\.com|replace-me|your-affiliate-link|[<>]")
 
 
-def resolve_path(path_str: str | Path) -> Path:
+@functools.lru_cache(maxsize=512)
+def _resolve_path_cached(path_str: str) -> Path:
     path = Path(path_str)
     return path if path.is_absolute() else ROOT_DIR / path
 
 
+def resolve_path(path_str: str | Path) -> Path:
+    return _resolve_path_cached(str(path_str))
+
+
 def load_yaml(path: str | Path) -> dict[str, Any]:
-    with resolve_path(path).open("r", encoding="utf-8") as fh:
-        return yaml.safe_load(fh) or {}
+    file_path = resolve_path(path)
+    data = _load_yaml_cached(str(file_path), file_path.stat().st_mtime_ns)
+    return copy.deepcopy(data)
+
+
+@functools.lru_cache(maxsize=16)
+def _load_yaml_cached(path_str: str, mtime_ns: int) -> dict[str, Any]:
+    with open(path_str, "r", encoding="utf-8") as fh:
+        return yaml.load(fh, Loader=_YamlLoader) or {}
+
+
+def read_text(path: str | Path) -> str:
+    file_path = resolve_path(path)
+    return _read_text_cached(str(file_path), file_path.stat().st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=32)
+def _read_text_cached(path_str: str, mtime_ns: int) -> str:
+    with open(path_str, "r", encoding="utf-8") as fh:
+        return fh.read()
 
 
 def load_system_config(path: str | Path) -> dict[str, Any]:
-    config = load_yaml(path)
+    file_path = resolve_path(path)
+    config = _load_system_config_cached(str(file_path), file_path.stat().st_mtime_ns)
+    return copy.deepcopy(config)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_system_config_cached(path_str: str, mtime_ns: int) -> dict[str, Any]:
+    config = _load_yaml_cached(path_str, mtime_ns)
     required_keys = [
         ("site", "base_url"),
         ("site", "title"),
@@ -47,27 +97,115 @@ def load_system_config(path: str | Path) -> dict[str, Any]:
     return config
 
 
-def read_csv_rows(path: str | Path, required_columns: list[str]) -> list[dict[str, str]]:
+def iter_csv_rows(path: str | Path, required_columns: list[str]) -> Iterator[dict[str, str]]:
     file_path = resolve_path(path)
     with file_path.open("r", encoding="utf-8", newline="") as fh:
-        reader = csv.DictReader(fh)
-        columns = reader.fieldnames or []
+        reader = csv.reader(fh)
+        columns = next(reader, [])
         missing = [col for col in required_columns if col not in columns]
         if missing:
             raise ValueError(
                 f"{file_path} is missing required columns: {', '.join(missing)}"
             )
-        return [dict(row) for row in reader]
+        for row in reader:
+            if row:
+                yield dict(zip(columns, row))
+
+
+def read_csv_rows(path: str | Path, required_columns: list[str]) -> list[dict[str, str]]:
+    return list(iter_csv_rows(path, required_columns))
+
+
+def sum_metric_windows(
+    path: str | Path, windows: list[tuple[dt.date, dt.date]]
+) -> list[tuple[int, int]]:
+    file_path = resolve_path(path)
+    if not windows or not file_path.exists():
+        return [(0, 0) for _ in windows]
+    totals = [[0, 0] for _ in windows]
+    # YYYY-MM-DD strings sort like dates, so rows outside every window are
+    # dropped on a string compare before any parsing.
+    low_key = min(start_day for start_day, _ in windows).isoformat()
+    high_key = max(end_day for _, end_day in windows).isoformat()
+    with file_path.open("r", encoding="utf-8", newline="") as fh:
+        reader = csv.reader(fh)
+        header = next(reader, [])
+        missing = [col for col in METRICS_COLUMNS if col not in header]
+        if missing:
+            raise ValueError(f"{file_path} is missing required columns: {', '.join(missing)}")
+        date_idx, pv_idx, clicks_idx = (header.index(col) for col in METRICS_COLUMNS)
+        width = max(date_idx, pv_idx, clicks_idx) + 1
+        for row in reader:
+            if len(row) < width:
+                row = row + [""] * (width - len(row))
+            raw_day = row[date_idx]
+            if len(raw_day) == 10 and not low_key <= raw_day <= high_key:
+                continue
+            try:
+                day = parse_iso_date(raw_day)
+            except ValueError:
+                continue
+            for total, (start_day, end_day) in zip(totals, windows):
+                if start_day <= day <= end_day:
+                    total[0] += safe_int(row[pv_idx])
+                    total[1] += safe_int(row[clicks_idx])
+    return [(pv, clicks) for pv, clicks in totals]
 
 
 def write_csv_rows(path: str | Path, rows: list[dict[str, Any]], fieldnames: list[str]) -> None:
     file_path = resolve_path(path)
     file_path.parent.mkdir(parents=True, exist_ok=True)
-    with file_path.open("w", encoding="utf-8", newline="") as fh:
-        writer = csv.DictWriter(fh, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in rows:
-            writer.writerow({name: row.get(name, "") for name in fieldnames})
+    tmp_path = file_path.with_name(file_path.name + ".tmp")
+    try:
+        with tmp_path.open("w", encoding="utf-8", newline="", buffering=1 << 16) as fh:
+            writer = csv.DictWriter(fh, fieldnames=fieldnames, restval="", extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(rows)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, file_path)
+
+
+_HTTP_SESSION_LOCK = threading.Lock()
+
+
+def http_session() -> requests.Session:
+    # lru_cache alone lets concurrent first calls from worker threads each build
+    # a session, so the first build is serialized.
+    with _HTTP_SESSION_LOCK:
+        return _build_http_session()
+
+
+@functools.lru_cache(maxsize=1)
+def _build_http_session() -> requests.Session:
+    # Imported lazily so scripts that skip live checks never load requests/urllib3.
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util import Retry
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=4,
+        max_retries=Retry(total=1, backoff_factor=0.2),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def http_ok(
+    url: str, session: requests.Session | None = None, timeout: int = 10
+) -> tuple[bool, str]:
+    client = session or http_session()
+    try:
+        res = client.head(url, timeout=timeout, allow_redirects=True)
+        if res.status_code in {405, 501}:
+            res = client.get(url, timeout=timeout)
+        return (res.status_code < 400, f"HTTP {res.status_code}")
+    except Exception as exc:  # pragma: no cover - network failure
+        return (False, f"error: {type(exc).__name__}")
 
 
 def today_jst() -> dt.datetime:
@@ -80,9 +218,9 @@ def iso_now() -> str:
 
 def slugify(text: str) -> str:
     value = text.strip().lower()
-    value = re.sub(r"\s+", "-", value)
-    value = re.sub(r"[^a-z0-9\-]", "-", value)
-    value = re.sub(r"-+", "-", value)
+    value = SLUG_SPACE_PATTERN.sub("-", value)
+    value = SLUG_INVALID_PATTERN.sub("-", value)
+    value = SLUG_DASH_PATTERN.sub("-", value)
     cleaned = value.strip("-")
     if cleaned:
         return cleaned
@@ -90,6 +228,39 @@ def slugify(text: str) -> str:
     return f"kw-{digest}"
 
 
+@functools.lru_cache(maxsize=4096)
+def parse_iso_date(value: str) -> dt.date:
+    # Clean YYYY-MM-DD values are the norm; only strip when the length says
+    # there is something to strip.
+    return dt.date.fromisoformat(value if len(value) == 10 else value.strip())
+
+
+@functools.lru_cache(maxsize=1024)
+def is_placeholder_url(url: str) -> bool:
+    value = (url or "").strip().lower()
+    return not value or bool(PLACEHOLDER_URL_PATTERN.search(value))
+
+
+def safe_int(value: str) -> int:
+    if not value:
+        return 0
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return int(float(value))
+    except (ValueError, TypeError, OverflowError):
+        return 0
+
+
+def is_affiliate_ready(row: dict[str, str]) -> bool:
+    status = row.get("status", "").strip().lower()
+    return status in AFFILIATE_READY_STATUSES and not is_placeholder_url(
+        row.get("affiliate_url", "")
+    )
+
+
 def parse_priority(value: str) -> int:
     try:
         return int(value)
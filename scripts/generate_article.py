@@ -1,21 +1,22 @@
 from __future__ import annotations
 
 import argparse
-import datetime as dt
 import os
 import re
 import textwrap
 from dataclasses import dataclass
 
-import requests
-
 if __package__ in {None, ""}:  # pragma: no cover
     import sys
     from pathlib import Path
 
     sys.path.append(str(Path(__file__).resolve().parent.parent))
 
-from scripts.common import dump_json
+from scripts.common import dump_json, http_session, today_jst
+
+SPACES_PATTERN = re.compile(r"\s+")
+MARKUP_PATTERN = re.compile(r"<[^>]+>")
+CTA_PATTERN = re.compile(r'<a\s+[^>]*rel="[^"]*sponsored[^"]*nofollow[^"]*"[^>]*>')
 
 
 @dataclass
@@ -27,7 +28,7 @@ class ArticleDraft:
 
 
 def _compact_spaces(text: str) -> str:
-    return re.sub(r"\s+", " ", text or "").strip()
+    return " ".join((text or "").split())
 
 
 def optimize_title_for_ctr(
@@ -38,7 +39,7 @@ def optimize_title_for_ctr(
     tool_name: str,
     max_chars: int = 48,
 ) -> str:
-    year = dt.datetime.now().year
+    year = today_jst().year
     keyword_clean = _compact_spaces(keyword)
     intent_clean = _compact_spaces(intent)
     current = _compact_spaces(title)
@@ -109,7 +110,7 @@ def _call_huggingface(model: str, token: str, prompt: str, timeout: int = 60) ->
             "return_full_text": False,
         },
     }
-    response = requests.post(url, headers=headers, json=payload, timeout=timeout)
+    response = http_session().post(url, headers=headers, json=payload, timeout=timeout)
     response.raise_for_status()
     data = response.json()
 
@@ -136,7 +137,7 @@ def _ensure_cta_block(tool_name: str, cta_url: str) -> str:
 
 
 def _cta_count(text: str) -> int:
-    return len(re.findall(r'<a\s+[^>]*rel=\"[^\"]*sponsored[^\"]*nofollow[^\"]*\"[^>]*>', text))
+    return sum(1 for _ in CTA_PATTERN.finditer(text or ""))
 
 
 def _ensure_min_cta_blocks(body: str, tool_name: str, cta_url: str, min_count: int = 2) -> str:
@@ -145,15 +146,17 @@ def _ensure_min_cta_blocks(body: str, tool_name: str, cta_url: str, min_count: i
     if not paragraphs:
         paragraphs = [body.strip()]
 
-    while _cta_count("\n\n".join(paragraphs)) < min_count:
+    current = _cta_count("\n\n".join(paragraphs))
+    while current < min_count:
         insert_pos = min(2, len(paragraphs))
         paragraphs.insert(insert_pos, cta)
+        current += 1
     return "\n\n".join(paragraphs)
 
 
 def _visible_char_count(text: str) -> int:
-    no_markup = re.sub(r"<[^>]+>", "", text)
-    no_space = re.sub(r"\s+", "", no_markup)
+    no_markup = MARKUP_PATTERN.sub("", text)
+    no_space = SPACES_PATTERN.sub("", no_markup)
     return len(no_space)
 
 
@@ -187,8 +190,11 @@ def _fallback_article(
         f"比較時の評価表は、価格、精度、学習負荷、連携性、監査性の5軸で作るのが実務的です。各軸を5点満点で評価し、導入目的に合わせて重みを付けると意思決定が速くなります。{tool_name}を候補にする場合も、他候補と同じ表で比較し、主観ではなく指標で選ぶことが重要です。",
         f"運用開始後は、毎週の定例で『使った機能』『使わなかった機能』『改善要望』を簡潔に収集し、次週の設定変更を1つだけ実施します。変更点を増やしすぎると因果が追えません。小さな改善を継続すると、チーム全体で{keyword}の活用度が安定して上がります。",
     ]
-    while _visible_char_count("\n\n".join(sections)) < (min_chars + 80):
+    visible_chars = sum(_visible_char_count(section) for section in sections)
+    supplements_chars = sum(_visible_char_count(section) for section in supplements)
+    while visible_chars < (min_chars + 80):
         sections.extend(supplements)
+        visible_chars += supplements_chars
     body = _ensure_min_cta_blocks("\n\n".join(sections), tool_name, cta_url, min_count=2)
     summary = f"{keyword}の導入判断で失敗しないための実務チェックポイントを整理。"
     return ArticleDraft(title=title, body=body, summary=summary, used_model=False)
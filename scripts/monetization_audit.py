@@ -1,11 +1,10 @@
 from __future__ import annotations
 
 import argparse
-import csv
 import datetime as dt
-import re
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
 if __package__ in {None, ""}:  # pragma: no cover
     import sys
@@ -14,11 +13,15 @@ if __package__ in {None, ""}:  # pragma: no cover
 
 from scripts.ad_revenue_validate import sum_ad_revenue
 from scripts.common import (
+    ADSENSE_PUBLISHER_PATTERN,
     dump_json,
+    is_affiliate_ready,
+    iter_csv_rows,
     load_system_config,
     load_yaml,
-    read_csv_rows,
     resolve_path,
+    sum_metric_windows,
+    today_jst,
 )
 
 TOOLS_COLUMNS = [
@@ -30,25 +33,6 @@ TOOLS_COLUMNS = [
     "status",
     "last_posted_at",
 ]
-METRICS_COLUMNS = ["date", "pv", "clicks"]
-AFFILIATE_READY_STATUSES = {"approved", "active", "affiliate_ready"}
-ADSENSE_PUBLISHER_PATTERN = re.compile(r"^ca-pub-\d{16}$")
-
-
-def _is_placeholder_url(url: str) -> bool:
-    value = (url or "").strip().lower()
-    if not value:
-        return True
-    return any(
-        token in value
-        for token in [
-            "example.com",
-            "replace-me",
-            "your-affiliate-link",
-            "<",
-            ">",
-        ]
-    )
 
 
 @dataclass
@@ -57,43 +41,18 @@ class MetricsSummary:
     clicks: int
 
 
-def _safe_int(value: str) -> int:
-    try:
-        return int(float(value))
-    except (ValueError, TypeError):
-        return 0
-
-
 def _load_recent_metrics(path: Path, days: int) -> MetricsSummary:
-    if not path.exists():
-        return MetricsSummary(pv=0, clicks=0)
-
-    today = dt.date.today()
+    today = today_jst().date()
     start_day = today - dt.timedelta(days=days - 1)
-    pv_total = 0
-    clicks_total = 0
-    with path.open("r", encoding="utf-8", newline="") as fh:
-        reader = csv.DictReader(fh)
-        columns = reader.fieldnames or []
-        missing = [col for col in METRICS_COLUMNS if col not in columns]
-        if missing:
-            raise ValueError(f"{path} is missing required columns: {', '.join(missing)}")
-        for row in reader:
-            try:
-                day = dt.date.fromisoformat(row.get("date", ""))
-            except ValueError:
-                continue
-            if start_day <= day <= today:
-                pv_total += _safe_int(row.get("pv", "0"))
-                clicks_total += _safe_int(row.get("clicks", "0"))
+    [(pv_total, clicks_total)] = sum_metric_windows(path, [(start_day, today)])
     return MetricsSummary(pv=pv_total, clicks=clicks_total)
 
 
 def _is_valid_adsense_publisher_id(value: str) -> bool:
-    return bool(ADSENSE_PUBLISHER_PATTERN.match((value or "").strip()))
+    return bool(ADSENSE_PUBLISHER_PATTERN.fullmatch((value or "").strip()))
 
 
-def cli() -> int:
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Audit monetization readiness")
     parser.add_argument("--config", default="config/system.yaml")
     parser.add_argument("--site-config", default="_config.yml")
@@ -102,24 +61,32 @@ def cli() -> int:
     parser.add_argument("--ad-revenue", default="")
     parser.add_argument("--window-days", type=int, default=28)
     parser.add_argument("--target-daily-usd", type=float, default=1.0)
-    args = parser.parse_args()
+    return parser
 
+
+def cli() -> int:
+    print(dump_json(run(build_parser().parse_args())))
+    return 0
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
     config = load_system_config(args.config)
     site_config = load_yaml(args.site_config)
-    tools = read_csv_rows(args.tools, TOOLS_COLUMNS)
     metrics = _load_recent_metrics(resolve_path(args.metrics), days=args.window_days)
 
-    affiliate_ready = [
-        row
-        for row in tools
-        if row.get("status", "").strip().lower() in AFFILIATE_READY_STATUSES
-        and not _is_placeholder_url(row.get("affiliate_url", ""))
-    ]
-    pending_or_placeholder = [
-        row
-        for row in tools
-        if row not in affiliate_ready
-    ]
+    ready_tools: list[str] = []
+    pending_tools: list[dict[str, str]] = []
+    for row in iter_csv_rows(args.tools, TOOLS_COLUMNS):
+        if is_affiliate_ready(row):
+            ready_tools.append(row.get("name", ""))
+        else:
+            pending_tools.append(
+                {
+                    "name": row.get("name", ""),
+                    "status": row.get("status", ""),
+                    "affiliate_url": row.get("affiliate_url", ""),
+                }
+            )
 
     ctr = (metrics.clicks / metrics.pv) if metrics.pv > 0 else 0.0
     default_epc = float(config["affiliate"]["default_epc_usd"])
@@ -128,7 +95,7 @@ def cli() -> int:
         config.get("reporting", {}).get("ad_revenue_csv", "data/ad_revenue.csv")
     )
     ad_revenue_path = resolve_path(args.ad_revenue or ad_revenue_default)
-    end_day = dt.date.today()
+    end_day = today_jst().date()
     start_day = end_day - dt.timedelta(days=args.window_days - 1)
     try:
         recent_adsense_revenue = sum_ad_revenue(ad_revenue_path, start_day, end_day)
@@ -154,24 +121,17 @@ def cli() -> int:
         actions.append("data/ad_revenue.csv の形式を修正し、週1で実績を追記")
     if metrics.pv <= 0:
         actions.append("検索流入を増やす（Search Console提出・記事改善・内部リンク強化）")
-    if len(affiliate_ready) == 0:
+    if len(ready_tools) == 0:
         actions.append("tools.csv の affiliate_url を実リンクに更新")
         actions.append("承認済み案件の status を approved か active に更新")
     actions.append("Daily Publish を毎日実行し、記事数を増やす")
 
     result = {
         "window_days": args.window_days,
-        "ready_tools_count": len(affiliate_ready),
-        "ready_tools": [row.get("name", "") for row in affiliate_ready],
-        "pending_tools_count": len(pending_or_placeholder),
-        "pending_tools": [
-            {
-                "name": row.get("name", ""),
-                "status": row.get("status", ""),
-                "affiliate_url": row.get("affiliate_url", ""),
-            }
-            for row in pending_or_placeholder
-        ],
+        "ready_tools_count": len(ready_tools),
+        "ready_tools": ready_tools,
+        "pending_tools_count": len(pending_tools),
+        "pending_tools": pending_tools,
         "recent_pv": metrics.pv,
         "recent_clicks": metrics.clicks,
         "recent_ctr": round(ctr * 100, 2),
@@ -191,8 +151,7 @@ def cli() -> int:
         "ad_revenue_valid": ad_revenue_valid,
         "actions": actions,
     }
-    print(dump_json(result))
-    return 0
+    return result
 
 
 if __name__ == "__main__":
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 import argparse
-import calendar
 import datetime as dt
 from pathlib import Path
+from typing import Iterable
 
 if __package__ in {None, ""}:  # pragma: no cover
     import sys
@@ -11,7 +11,11 @@ if __package__ in {None, ""}:  # pragma: no cover
     sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from scripts.common import (
+    AFFILIATE_READY_STATUSES,
     dump_json,
+    is_affiliate_ready,
+    is_placeholder_url,
+    iter_csv_rows,
     load_system_config,
     read_csv_rows,
     resolve_path,
@@ -19,7 +23,6 @@ from scripts.common import (
     today_jst,
     write_csv_rows,
 )
-from scripts.generate_article import generate_article
 from scripts.quality_gate import run_quality_gate
 from scripts.select_topic import REQUIRED_COLUMNS as KEYWORD_COLUMNS
 from scripts.select_topic import mark_topic_used, select_topic
@@ -34,21 +37,6 @@ TOOLS_COLUMNS = [
     "last_posted_at",
 ]
 COST_COLUMNS = ["month", "total_usd"]
-AFFILIATE_READY_STATUSES = {"approved", "active", "affiliate_ready"}
-
-
-def _is_placeholder_url(url: str) -> bool:
-    value = (url or "").strip().lower()
-    if not value:
-        return True
-    placeholders = [
-        "example.com",
-        "replace-me",
-        "your-affiliate-link",
-        "<",
-        ">",
-    ]
-    return any(token in value for token in placeholders)
 
 
 def _parse_date(value: str) -> dt.date:
@@ -63,12 +51,7 @@ def select_tool(
 ) -> dict[str, str]:
     if not rows:
         raise ValueError("tools.csv has no rows")
-    monetizable_rows = [
-        row
-        for row in rows
-        if row.get("status", "").strip().lower() in AFFILIATE_READY_STATUSES
-        and not _is_placeholder_url(row.get("affiliate_url", ""))
-    ]
+    monetizable_rows = [row for row in rows if is_affiliate_ready(row)]
     candidate_rows = monetizable_rows or rows
     if excluded_tool_ids:
         filtered = [
@@ -89,24 +72,32 @@ def resolve_cta_url(tool: dict[str, str]) -> str:
     affiliate_url = tool.get("affiliate_url", "").strip()
     official_url = tool.get("official_url", "").strip()
 
-    if (
-        status in AFFILIATE_READY_STATUSES
-        and affiliate_url
-        and not _is_placeholder_url(affiliate_url)
-    ):
+    affiliate_usable = not is_placeholder_url(affiliate_url)
+
+    if status in AFFILIATE_READY_STATUSES and affiliate_usable:
         return affiliate_url
     if official_url:
         return official_url
-    if affiliate_url and not _is_placeholder_url(affiliate_url):
+    if affiliate_usable:
         return affiliate_url
     raise ValueError(f"tool '{tool.get('name', 'unknown')}' has no usable URL")
 
 
-def generate_unique_slug(base_slug: str, posts_dir: Path, date_prefix: str) -> str:
-    posts_dir.mkdir(parents=True, exist_ok=True)
+def existing_post_stems(posts_dir: Path) -> set[str]:
+    return {path.stem for path in posts_dir.glob("*.md")}
+
+
+def generate_unique_slug(
+    base_slug: str,
+    posts_dir: Path,
+    date_prefix: str,
+    existing_names: set[str] | None = None,
+) -> str:
+    if existing_names is None:
+        posts_dir.mkdir(parents=True, exist_ok=True)
+        existing_names = existing_post_stems(posts_dir)
     candidate = base_slug
     suffix = 2
-    existing_names = {path.stem for path in posts_dir.glob("*.md")}
 
     while f"{date_prefix}-{candidate}" in existing_names:
         candidate = f"{base_slug}-{suffix}"
@@ -116,9 +107,13 @@ def generate_unique_slug(base_slug: str, posts_dir: Path, date_prefix: str) -> s
 
 
 def reserve_unique_slug(
-    base_slug: str, posts_dir: Path, date_prefix: str, reserved_stems: set[str]
+    base_slug: str,
+    posts_dir: Path,
+    date_prefix: str,
+    reserved_stems: set[str],
+    existing_names: set[str] | None = None,
 ) -> str:
-    slug = generate_unique_slug(base_slug, posts_dir, date_prefix)
+    slug = generate_unique_slug(base_slug, posts_dir, date_prefix, existing_names=existing_names)
     candidate = slug
     suffix = 2
     while f"{date_prefix}-{candidate}" in reserved_stems:
@@ -129,7 +124,9 @@ def reserve_unique_slug(
 
 
 def _yaml_escape(value: str) -> str:
-    return value.replace('"', '\\"')
+    if '"' not in value and "\\" not in value:
+        return value
+    return value.replace("\\", "\\\\").replace('"', '\\"')
 
 
 def build_post_markdown(
@@ -160,28 +157,34 @@ def build_post_markdown(
     return front_matter + body.strip() + "\n"
 
 
-def _within_month(day: dt.date, month_str: str) -> bool:
-    if not month_str:
-        return False
+def _month_key(month_str: str) -> str | None:
     try:
         year, month = month_str.split("-", 1)
-        return day.year == int(year) and day.month == int(month)
+        return f"{int(year)}-{int(month):02d}"
     except (ValueError, TypeError):
-        return False
+        return None
+
+
+def monthly_cost_totals(costs_rows: Iterable[dict[str, str]]) -> dict[str, float]:
+    totals: dict[str, float] = {}
+    for row in costs_rows:
+        key = _month_key(row.get("month", ""))
+        if key is None:
+            continue
+        try:
+            amount = float(row.get("total_usd", "0") or "0")
+        except ValueError:
+            continue
+        totals[key] = totals.get(key, 0.0) + amount
+    return totals
 
 
 def should_skip_for_budget(
     today: dt.date,
-    costs_rows: list[dict[str, str]],
+    monthly_totals: dict[str, float],
     max_monthly_usd: float,
 ) -> bool:
-    current_month_total = 0.0
-    for row in costs_rows:
-        if _within_month(today, row.get("month", "")):
-            try:
-                current_month_total += float(row.get("total_usd", "0") or "0")
-            except ValueError:
-                continue
+    current_month_total = monthly_totals.get(f"{today.year}-{today.month:02d}", 0.0)
     if current_month_total <= max_monthly_usd:
         return False
     return today.day % 2 == 1
@@ -190,13 +193,11 @@ def should_skip_for_budget(
 def _update_tool_last_posted(
     rows: list[dict[str, str]], selected_tool_id: str, posted_at: dt.datetime
 ) -> list[dict[str, str]]:
-    new_rows: list[dict[str, str]] = []
+    posted_on = posted_at.date().isoformat()
     for row in rows:
-        copied = dict(row)
         if row.get("tool_id") == selected_tool_id:
-            copied["last_posted_at"] = posted_at.date().isoformat()
-        new_rows.append(copied)
-    return new_rows
+            row["last_posted_at"] = posted_on
+    return rows
 
 
 def _generate_one_post(
@@ -207,10 +208,13 @@ def _generate_one_post(
     tools: list[dict[str, str]],
     used_tool_ids: set[str],
     posts_dir: Path,
+    existing_stems: set[str],
     reserved_stems: set[str],
     force_template: bool,
     write: bool,
 ) -> tuple[dict[str, str] | None, list[dict[str, str]], list[dict[str, str]]]:
+    from scripts.generate_article import generate_article
+
     topic = select_topic(keywords)
     if topic is None:
         return None, keywords, tools
@@ -234,7 +238,11 @@ def _generate_one_post(
     slug_base = slugify(f"{topic['keyword']}-{tool['name']}")
     date_prefix = now.date().isoformat()
     slug = reserve_unique_slug(
-        slug_base, posts_dir, date_prefix=date_prefix, reserved_stems=reserved_stems
+        slug_base,
+        posts_dir,
+        date_prefix=date_prefix,
+        reserved_stems=reserved_stems,
+        existing_names=existing_stems,
     )
 
     markdown = build_post_markdown(
@@ -252,6 +260,7 @@ def _generate_one_post(
         text=markdown,
         min_chars=int(config["content"]["min_chars"]),
         disclosure_text=str(config["affiliate"]["disclosure_text"]),
+        fast_fail=True,
     )
     if not gate.passed:
         raise RuntimeError("Quality gate failed: " + " | ".join(gate.issues))
@@ -260,6 +269,7 @@ def _generate_one_post(
     if write:
         output_file.parent.mkdir(parents=True, exist_ok=True)
         output_file.write_text(markdown, encoding="utf-8")
+        existing_stems.add(output_file.stem)
 
     updated_keywords = mark_topic_used(keywords, topic["keyword"], now)
     updated_tools = _update_tool_last_posted(tools, tool["tool_id"], now)
@@ -293,10 +303,14 @@ def cli() -> int:
     tools = read_csv_rows(args.tools, TOOLS_COLUMNS)
 
     costs_path = resolve_path(args.costs)
-    costs_rows = read_csv_rows(costs_path, COST_COLUMNS) if costs_path.exists() else []
+    monthly_totals = (
+        monthly_cost_totals(iter_csv_rows(costs_path, COST_COLUMNS))
+        if costs_path.exists()
+        else {}
+    )
 
     max_monthly_usd = float(config.get("cost", {}).get("max_monthly_usd", 5.0))
-    if should_skip_for_budget(today, costs_rows, max_monthly_usd=max_monthly_usd):
+    if should_skip_for_budget(today, monthly_totals, max_monthly_usd=max_monthly_usd):
         print(
             dump_json(
                 {
@@ -314,6 +328,7 @@ def cli() -> int:
     current_keywords = keywords
     current_tools = tools
     generated: list[dict[str, str]] = []
+    existing_stems = existing_post_stems(posts_dir)
     reserved_stems: set[str] = set()
     used_tool_ids: set[str] = set()
 
@@ -325,6 +340,7 @@ def cli() -> int:
             tools=current_tools,
             used_tool_ids=used_tool_ids,
             posts_dir=posts_dir,
+            existing_stems=existing_stems,
             reserved_stems=reserved_stems,
             force_template=args.mock,
             write=not args.dry_run,
@@ -341,7 +357,8 @@ def cli() -> int:
         write_csv_rows(args.keywords, current_keywords, KEYWORD_COLUMNS)
         write_csv_rows(args.tools, current_tools, TOOLS_COLUMNS)
 
-    month_last_day = calendar.monthrange(today.year, today.month)[1]
+    next_month = dt.date(today.year + today.month // 12, today.month % 12 + 1, 1)
+    month_last_day = (next_month - dt.timedelta(days=1)).day
     print(
         dump_json(
             {
@@ -3,6 +3,7 @@ from __future__ import annotations
 import argparse
 import re
 from dataclasses import dataclass
+from typing import Iterator
 
 if __package__ in {None, ""}:  # pragma: no cover
     import sys
@@ -21,6 +22,13 @@ BANNED_PHRASES = [
     "副作用はありません",
     "絶対に稼げる",
 ]
+FRONT_MATTER_PATTERN = re.compile(r"^---[\s\S]*?---\n")
+STRIP_PATTERN = re.compile(r"<[^>]+>|\s+")
+SENTENCE_SPLIT_PATTERN = re.compile(r"[。\n]")
+EXTERNAL_ANCHOR_PATTERN = re.compile(r'<a\s+([^>]*href="https?://[^"]+"[^>]*)>')
+HREF_PATTERN = re.compile(r'href="([^"]+)"')
+REL_PATTERN = re.compile(r'rel="([^"]+)"')
+MARKDOWN_LINK_PATTERN = re.compile(r"\[[^\]]+\]\(https?://[^)]+\)")
 
 
 @dataclass
@@ -30,72 +38,78 @@ class GateResult:
 
 
 def _char_count(text: str) -> int:
-    no_front_matter = re.sub(r"^---[\s\S]*?---\n", "", text, count=1)
-    no_markup = re.sub(r"<[^>]+>", "", no_front_matter)
-    no_space = re.sub(r"\s+", "", no_markup)
-    return len(no_space)
+    front_matter = FRONT_MATTER_PATTERN.match(text)
+    start = front_matter.end() if front_matter else 0
+    stripped = sum(m.end() - m.start() for m in STRIP_PATTERN.finditer(text, start))
+    return len(text) - start - stripped
 
 
 def _duplicate_ratio(text: str) -> float:
-    sentences = [s.strip() for s in re.split(r"[。\n]", text) if s.strip()]
+    sentences = [s.strip() for s in SENTENCE_SPLIT_PATTERN.split(text) if s.strip()]
     if not sentences:
         return 0.0
-    seen: dict[str, int] = {}
-    duplicates = 0
-    for sentence in sentences:
-        seen[sentence] = seen.get(sentence, 0) + 1
-    for count in seen.values():
-        if count > 1:
-            duplicates += count - 1
+    duplicates = len(sentences) - len(set(sentences))
     return duplicates / len(sentences)
 
 
 def _find_external_anchors(text: str) -> list[tuple[str, str]]:
     anchors: list[tuple[str, str]] = []
-    for match in re.finditer(r"<a\s+([^>]*href=\"https?://[^\"]+\"[^>]*)>", text):
+    for match in EXTERNAL_ANCHOR_PATTERN.finditer(text):
         attrs = match.group(1)
-        href_match = re.search(r'href=\"([^\"]+)\"', attrs)
+        href_match = HREF_PATTERN.search(attrs)
         href = href_match.group(1) if href_match else ""
         anchors.append((href, attrs))
     return anchors
 
 
-def run_quality_gate(
+def _iter_issues(
     text: str,
     min_chars: int,
     disclosure_text: str,
-    max_duplicate_ratio: float = 0.35,
-) -> GateResult:
-    issues: list[str] = []
-
-    char_count = _char_count(text)
-    if char_count < min_chars:
-        issues.append(f"本文文字数が不足: {char_count} < {min_chars}")
-
-    ratio = _duplicate_ratio(text)
-    if ratio > max_duplicate_ratio:
-        issues.append(f"重複率が高すぎます: {ratio:.2%} > {max_duplicate_ratio:.2%}")
+    max_duplicate_ratio: float,
+) -> Iterator[str]:
+    # Cheapest checks first so fast_fail callers stop before the full-text passes.
+    if disclosure_text not in text:
+        yield "広告表記文が本文に存在しません"
 
     for phrase in BANNED_PHRASES:
         if phrase in text:
-            issues.append(f"禁止表現を検出: {phrase}")
+            yield f"禁止表現を検出: {phrase}"
 
-    if disclosure_text not in text:
-        issues.append("広告表記文が本文に存在しません")
-
-    md_link_matches = re.findall(r"\[[^\]]+\]\(https?://[^\)]+\)", text)
-    if md_link_matches:
-        issues.append("Markdown形式の外部リンクを検出。CTAはHTML <a> で rel を指定してください")
+    if MARKDOWN_LINK_PATTERN.search(text):
+        yield "Markdown形式の外部リンクを検出。CTAはHTML <a> で rel を指定してください"
 
     anchors = _find_external_anchors(text)
     if not anchors:
-        issues.append("外部リンクCTAが存在しません")
+        yield "外部リンクCTAが存在しません"
     for href, attrs in anchors:
-        rel_match = re.search(r'rel=\"([^\"]+)\"', attrs)
+        rel_match = REL_PATTERN.search(attrs)
         rel_values = set((rel_match.group(1).lower().split() if rel_match else []))
         if "sponsored" not in rel_values or "nofollow" not in rel_values:
-            issues.append(f"外部リンク({href})に rel=\"sponsored nofollow\" が未設定")
+            yield f"外部リンク({href})に rel=\"sponsored nofollow\" が未設定"
 
+    char_count = _char_count(text)
+    if char_count < min_chars:
+        yield f"本文文字数が不足: {char_count} < {min_chars}"
+
+    ratio = _duplicate_ratio(text)
+    if ratio > max_duplicate_ratio:
+        yield f"重複率が高すぎます: {ratio:.2%} > {max_duplicate_ratio:.2%}"
+
+
+def run_quality_gate(
+    text: str,
+    min_chars: int,
+    disclosure_text: str,
+    max_duplicate_ratio: float = 0.35,
+    fast_fail: bool = False,
+) -> GateResult:
+    checks = _iter_issues(text, min_chars, disclosure_text, max_duplicate_ratio)
+    if fast_fail:
+        first_issue = next(checks, None)
+        issues = [first_issue] if first_issue is not None else []
+    else:
+        issues = list(checks)
     return GateResult(passed=not issues, issues=issues)
 
 
@@ -1,14 +1,22 @@
 from __future__ import annotations
 
 import argparse
+import itertools
 from pathlib import Path
+from typing import Any
 
 if __package__ in {None, ""}:  # pragma: no cover
     import sys
 
     sys.path.append(str(Path(__file__).resolve().parent.parent))
 
-from scripts.common import load_system_config, read_csv_rows, resolve_path, write_csv_rows
+from scripts.common import (
+    iter_csv_rows,
+    load_system_config,
+    read_csv_rows,
+    resolve_path,
+    write_csv_rows,
+)
 from scripts.select_topic import REQUIRED_COLUMNS
 
 SEED_TEMPLATE = [
@@ -20,12 +28,12 @@ SEED_TEMPLATE = [
 ]
 
 
-def _normalize_keyword(value: str) -> str:
-    return "".join((value or "").split()).lower()
+# Every character str.split() treats as whitespace (the highest is U+3000).
+WHITESPACE_TABLE = {cp: None for cp in range(0x3001) if chr(cp).isspace()}
 
 
-def _existing_set(rows: list[dict[str, str]]) -> set[str]:
-    return {_normalize_keyword(row.get("keyword", "")) for row in rows if row.get("keyword")}
+def _normalize_keyword(value: str) -> str:
+    return (value or "").translate(WHITESPACE_TABLE).lower()
 
 
 def _make_row(keyword: str, intent: str, priority: int) -> dict[str, str]:
@@ -38,7 +46,7 @@ def _make_row(keyword: str, intent: str, priority: int) -> dict[str, str]:
     }
 
 
-def cli() -> int:
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Refresh keyword pool from current tools")
     parser.add_argument("--config", default="config/system.yaml")
     parser.add_argument("--keywords", default="data/keywords.csv")
@@ -46,13 +54,33 @@ def cli() -> int:
     parser.add_argument("--min-pool", type=int, default=80)
     parser.add_argument("--max-add", type=int, default=40)
     parser.add_argument("--dry-run", action="store_true")
-    args = parser.parse_args()
+    return parser
 
+
+def cli() -> int:
+    print(run(build_parser().parse_args()))
+    return 0
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
     config = load_system_config(args.config)
     min_pool = max(1, int(config.get("growth", {}).get("min_keyword_pool", args.min_pool)))
     max_add = max(1, int(config.get("growth", {}).get("keyword_add_limit", args.max_add)))
 
-    keywords = read_csv_rows(args.keywords, REQUIRED_COLUMNS)
+    keywords: list[dict[str, str]] = []
+    existing: set[str] = set()
+    active_count = 0
+    for row in iter_csv_rows(args.keywords, REQUIRED_COLUMNS):
+        keywords.append(row)
+        if row.get("keyword"):
+            existing.add(_normalize_keyword(row["keyword"]))
+        if row.get("status", "").strip().lower() not in {"archived", "paused"}:
+            active_count += 1
+
+    needed = max(0, min_pool - active_count)
+    if needed == 0:
+        return {"added": 0, "reason": "pool_sufficient", "active_count": active_count}
+
     tools = read_csv_rows(
         args.tools,
         [
@@ -66,50 +94,30 @@ def cli() -> int:
         ],
     )
 
-    active_count = len(
-        [
-            row
-            for row in keywords
-            if row.get("status", "").strip().lower() not in {"archived", "paused"}
-        ]
-    )
-    needed = max(0, min_pool - active_count)
-    if needed == 0:
-        print({"added": 0, "reason": "pool_sufficient", "active_count": active_count})
-        return 0
-
-    existing = _existing_set(keywords)
     additions: list[dict[str, str]] = []
-    for tool in tools:
-        tool_name = tool.get("name", "").strip()
-        if not tool_name:
+    limit = min(needed, max_add)
+    tool_names = [name for name in (tool.get("name", "").strip() for tool in tools) if name]
+    for tool_name, (pattern, intent, priority) in itertools.product(tool_names, SEED_TEMPLATE):
+        keyword = pattern.format(tool=tool_name)
+        key = _normalize_keyword(keyword)
+        if key in existing:
             continue
-        for pattern, intent, priority in SEED_TEMPLATE:
-            keyword = pattern.format(tool=tool_name)
-            key = _normalize_keyword(keyword)
-            if key in existing:
-                continue
-            additions.append(_make_row(keyword, intent, priority))
-            existing.add(key)
-            if len(additions) >= min(needed, max_add):
-                break
-        if len(additions) >= min(needed, max_add):
+        additions.append(_make_row(keyword, intent, priority))
+        existing.add(key)
+        if len(additions) >= limit:
             break
 
     if additions and not args.dry_run:
-        merged = keywords + additions
-        write_csv_rows(resolve_path(args.keywords), merged, REQUIRED_COLUMNS)
-
-    print(
-        {
-            "added": len(additions),
-            "active_count_before": active_count,
-            "active_count_after": active_count + len(additions),
-            "target_min_pool": min_pool,
-            "sample": [row["keyword"] for row in additions[:5]],
-        }
-    )
-    return 0
+        keywords.extend(additions)
+        write_csv_rows(resolve_path(args.keywords), keywords, REQUIRED_COLUMNS)
+
+    return {
+        "added": len(additions),
+        "active_count_before": active_count,
+        "active_count_after": active_count + len(additions),
+        "target_min_pool": min_pool,
+        "sample": [row["keyword"] for row in additions[:5]],
+    }
 
 
 if __name__ == "__main__":
@@ -1,23 +1,37 @@
 from __future__ import annotations
 
 import argparse
-import datetime as dt
-import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 
-import requests
-
 if __package__ in {None, ""}:  # pragma: no cover
     import sys
 
     sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from scripts.ad_revenue_validate import read_rows as read_ad_revenue_rows
-from scripts.common import dump_json, load_system_config, load_yaml, read_csv_rows, resolve_path
+from scripts.common import (
+    ADSENSE_PUBLISHER_PATTERN,
+    dump_json,
+    http_ok,
+    is_affiliate_ready,
+    load_system_config,
+    load_yaml,
+    read_csv_rows,
+    read_text,
+    resolve_path,
+    today_jst,
+)
 from scripts.monetization_audit import TOOLS_COLUMNS
 
-ADSENSE_PUBLISHER_PATTERN = re.compile(r"^ca-pub-\d{16}$")
+LAYOUT_MARKERS = (
+    "cookie-consent-banner",
+    'data-cookie-action="accept"',
+    "if (hasConsent())",
+    "function loadAdsense()",
+    "loadAdsense();",
+)
 
 
 @dataclass
@@ -27,30 +41,6 @@ class CheckItem:
     detail: str
 
 
-def _is_placeholder_url(url: str) -> bool:
-    value = (url or "").strip().lower()
-    if not value:
-        return True
-    return any(
-        token in value
-        for token in [
-            "example.com",
-            "replace-me",
-            "your-affiliate-link",
-            "<",
-            ">",
-        ]
-    )
-
-
-def _http_ok(url: str, timeout: int = 10) -> tuple[bool, str]:
-    try:
-        res = requests.get(url, timeout=timeout)
-        return (res.status_code < 400, f"HTTP {res.status_code}")
-    except Exception as exc:  # pragma: no cover
-        return (False, f"error: {type(exc).__name__}")
-
-
 def build_checks(
     *,
     config: dict[str, object],
@@ -61,7 +51,13 @@ def build_checks(
     base_url = str(config["site"]["base_url"]).rstrip("/")
     measurement_id = str(site_config.get("ga4_measurement_id", "")).strip()
     adsense_publisher_id = str(site_config.get("adsense_publisher_id", "")).strip()
-    layout_text = resolve_path("_layouts/default.html").read_text(encoding="utf-8")
+    layout_text = read_text("_layouts/default.html")
+    found_markers = {marker for marker in LAYOUT_MARKERS if marker in layout_text}
+    robots_path = resolve_path("robots.txt")
+    sitemap_path = resolve_path("sitemap.xml")
+    disclosure_path = resolve_path("content/legal/disclosure.md")
+    privacy_path = resolve_path("content/legal/privacy.md")
+    terms_path = resolve_path("content/legal/terms.md")
     ad_revenue_path = resolve_path(
         str(config.get("reporting", {}).get("ad_revenue_csv", "data/ad_revenue.csv"))
     )
@@ -89,49 +85,49 @@ def build_checks(
         ),
         CheckItem(
             name="AdSense Publisher ID 形式が妥当",
-            passed=bool(ADSENSE_PUBLISHER_PATTERN.match(adsense_publisher_id)),
+            passed=bool(ADSENSE_PUBLISHER_PATTERN.fullmatch(adsense_publisher_id)),
             detail=adsense_publisher_id or "未設定",
         ),
         CheckItem(
             name="robots.txt がリポジトリに存在",
-            passed=resolve_path("robots.txt").exists(),
-            detail=str(resolve_path("robots.txt")),
+            passed=robots_path.exists(),
+            detail=str(robots_path),
         ),
         CheckItem(
             name="sitemap.xml がリポジトリに存在",
-            passed=resolve_path("sitemap.xml").exists(),
-            detail=str(resolve_path("sitemap.xml")),
+            passed=sitemap_path.exists(),
+            detail=str(sitemap_path),
         ),
         CheckItem(
             name="広告表記ページが存在",
-            passed=resolve_path("content/legal/disclosure.md").exists(),
-            detail=str(resolve_path("content/legal/disclosure.md")),
+            passed=disclosure_path.exists(),
+            detail=str(disclosure_path),
         ),
         CheckItem(
             name="プライバシーポリシーが存在",
-            passed=resolve_path("content/legal/privacy.md").exists(),
-            detail=str(resolve_path("content/legal/privacy.md")),
+            passed=privacy_path.exists(),
+            detail=str(privacy_path),
         ),
         CheckItem(
             name="利用規約ページが存在",
-            passed=resolve_path("content/legal/terms.md").exists(),
-            detail=str(resolve_path("content/legal/terms.md")),
+            passed=terms_path.exists(),
+            detail=str(terms_path),
         ),
         CheckItem(
             name="Cookie同意バナー(同意前GA停止)が実装済み",
             passed=(
-                "cookie-consent-banner" in layout_text
-                and "data-cookie-action=\"accept\"" in layout_text
-                and "if (hasConsent())" in layout_text
+                "cookie-consent-banner" in found_markers
+                and 'data-cookie-action="accept"' in found_markers
+                and "if (hasConsent())" in found_markers
             ),
             detail="_layouts/default.html",
         ),
         CheckItem(
             name="同意後のみAdSense読込が実装済み",
             passed=(
-                "function loadAdsense()" in layout_text
-                and "loadAdsense();" in layout_text
-                and "if (hasConsent())" in layout_text
+                "function loadAdsense()" in found_markers
+                and "loadAdsense();" in found_markers
+                and "if (hasConsent())" in found_markers
             ),
             detail="_layouts/default.html",
         ),
@@ -142,12 +138,7 @@ def build_checks(
         ),
     ]
 
-    ready_tools = [
-        row
-        for row in tools
-        if row.get("status", "").strip().lower() in {"approved", "active", "affiliate_ready"}
-        and not _is_placeholder_url(row.get("affiliate_url", ""))
-    ]
+    ready_tools = [row for row in tools if is_affiliate_ready(row)]
     checks.append(
         CheckItem(
             name="収益化リンク(approved/active)が1件以上",
@@ -157,9 +148,10 @@ def build_checks(
     )
 
     if live_check:
-        root_ok, root_detail = _http_ok(base_url)
-        sitemap_ok, sitemap_detail = _http_ok(f"{base_url}/sitemap.xml")
-        robots_ok, robots_detail = _http_ok(f"{base_url}/robots.txt")
+        urls = [base_url, f"{base_url}/sitemap.xml", f"{base_url}/robots.txt"]
+        with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+            results = list(pool.map(http_ok, urls))
+        (root_ok, root_detail), (sitemap_ok, sitemap_detail), (robots_ok, robots_detail) = results
         checks.extend(
             [
                 CheckItem(
@@ -188,7 +180,7 @@ def render_markdown(
     base_url: str,
     checks: list[CheckItem],
 ) -> str:
-    now_jst = dt.datetime.now(dt.timezone(dt.timedelta(hours=9))).strftime("%Y-%m-%d %H:%M JST")
+    now_jst = today_jst().strftime("%Y-%m-%d %H:%M JST")
     passed = sum(1 for item in checks if item.passed)
     total = len(checks)
 
@@ -31,22 +31,19 @@ def select_topic(rows: list[dict[str, str]]) -> dict[str, str] | None:
         return None
 
     unused = [row for row in available if not row.get("last_used_at")]
-    target = sorted(unused or available, key=_sort_key)[0]
-    return target
+    return min(unused or available, key=_sort_key)
 
 
 def mark_topic_used(
     rows: list[dict[str, str]], selected_keyword: str, used_at: dt.datetime
 ) -> list[dict[str, str]]:
-    updated: list[dict[str, str]] = []
+    used_on = used_at.date().isoformat()
     for row in rows:
-        new_row = dict(row)
         if row.get("keyword") == selected_keyword:
-            new_row["last_used_at"] = used_at.date().isoformat()
+            row["last_used_at"] = used_on
             if row.get("status", "").lower() in {"new", "ready", ""}:
-                new_row["status"] = "used"
-        updated.append(new_row)
-    return updated
+                row["status"] = "used"
+    return rows
 
 
 def cli() -> int:
@@ -3,6 +3,7 @@ from __future__ import annotations
 import argparse
 import re
 from pathlib import Path
+from typing import Any
 
 import yaml
 
@@ -11,10 +12,45 @@ if __package__ in {None, ""}:  # pragma: no cover
 
     sys.path.append(str(Path(__file__).resolve().parent.parent))
 
-from scripts.common import dump_json, resolve_path
+from scripts.common import (
+    ADSENSE_PUBLISHER_PATTERN,
+    GA4_MEASUREMENT_PATTERN,
+    dump_json,
+    resolve_path,
+)
 
-GA4_MEASUREMENT_PATTERN = re.compile(r"^G-[A-Z0-9]+$")
-ADSENSE_PUBLISHER_PATTERN = re.compile(r"^ca-pub-\d{16}$")
+
+TRACKING_KEYS = ("ga4_measurement_id", "adsense_publisher_id")
+KEY_LINE_PATTERNS = {
+    key: re.compile(rf"^{key}:(?P<value>[^\r\n]*)$", re.MULTILINE) for key in TRACKING_KEYS
+}
+
+
+def _patch_lines(text: str, updates: dict[str, str]) -> str:
+    for key, value in updates.items():
+        line = f"{key}: {value}"
+        pattern = KEY_LINE_PATTERNS[key]
+        if pattern.search(text):
+            text = pattern.sub(lambda _: line, text, count=1)
+            continue
+        if text and not text.endswith("\n"):
+            text += "\n"
+        text = f"{text}{line}\n"
+    return text
+
+
+def _apply_updates(text: str, updates: dict[str, str]) -> tuple[str, dict[str, Any]]:
+    data = yaml.safe_load(text) or {}
+    expected = {**data, **updates}
+    patched = _patch_lines(text, updates)
+    try:
+        if yaml.safe_load(patched) == expected:
+            return patched, expected
+    except yaml.YAMLError:
+        pass
+    # The key line was not a plain `key: scalar` (block scalar, flow mapping, ...),
+    # so fall back to re-dumping the whole document.
+    return yaml.safe_dump(expected, allow_unicode=True, sort_keys=False), expected
 
 
 def cli() -> int:
@@ -22,37 +58,35 @@ def cli() -> int:
     parser.add_argument("--config", default="_config.yml")
     parser.add_argument("--ga4", default="")
     parser.add_argument("--adsense", default="")
-    args = parser.parse_args()
+    print(dump_json(run(parser.parse_args())))
+    return 0
+
 
+def run(args: argparse.Namespace) -> dict[str, Any]:
     path = resolve_path(args.config)
-    data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    text = path.read_text(encoding="utf-8")
+    updates: dict[str, str] = {}
 
     if args.ga4:
-        if not GA4_MEASUREMENT_PATTERN.match(args.ga4.strip()):
+        if not GA4_MEASUREMENT_PATTERN.fullmatch(args.ga4.strip()):
             raise ValueError("Invalid GA4 measurement id format. expected: G-XXXX")
-        data["ga4_measurement_id"] = args.ga4.strip()
+        updates["ga4_measurement_id"] = args.ga4.strip()
 
     if args.adsense:
-        if not ADSENSE_PUBLISHER_PATTERN.match(args.adsense.strip()):
+        if not ADSENSE_PUBLISHER_PATTERN.fullmatch(args.adsense.strip()):
             raise ValueError(
                 "Invalid AdSense publisher id format. expected: ca-pub-xxxxxxxxxxxxxxxx"
             )
-        data["adsense_publisher_id"] = args.adsense.strip()
-
-    path.write_text(
-        yaml.safe_dump(data, allow_unicode=True, sort_keys=False),
-        encoding="utf-8",
-    )
-    print(
-        dump_json(
-            {
-                "config": str(path),
-                "ga4_measurement_id": data.get("ga4_measurement_id", ""),
-                "adsense_publisher_id": data.get("adsense_publisher_id", ""),
-            }
-        )
-    )
-    return 0
+        updates["adsense_publisher_id"] = args.adsense.strip()
+
+    text, data = _apply_updates(text, updates)
+    if updates:
+        path.write_text(text, encoding="utf-8")
+    return {
+        "config": str(path),
+        "ga4_measurement_id": data.get("ga4_measurement_id", ""),
+        "adsense_publisher_id": data.get("adsense_publisher_id", ""),
+    }
 
 
 if __name__ == "__main__":
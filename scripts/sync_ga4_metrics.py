@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 import argparse
+import bisect
 import csv
 import datetime as dt
-import json
 import os
 from pathlib import Path
 
@@ -12,7 +12,12 @@ if __package__ in {None, ""}:  # pragma: no cover
 
     sys.path.append(str(Path(__file__).resolve().parent.parent))
 
-from scripts.common import load_system_config, resolve_path
+from scripts.common import (
+    dump_json,
+    load_system_config,
+    resolve_path,
+    today_jst,
+)
 
 METRICS_COLUMNS = ["date", "pv", "clicks"]
 
@@ -21,86 +26,103 @@ def _load_rows(path: Path) -> list[dict[str, str]]:
     if not path.exists():
         return []
     with path.open("r", encoding="utf-8", newline="") as fh:
-        reader = csv.DictReader(fh)
-        fields = reader.fieldnames or []
-        missing = [col for col in METRICS_COLUMNS if col not in fields]
+        reader = csv.reader(fh)
+        header = next(reader, [])
+        missing = [col for col in METRICS_COLUMNS if col not in header]
         if missing:
             raise ValueError(f"{path} is missing columns: {', '.join(missing)}")
-        return [dict(row) for row in reader]
+        date_idx, pv_idx, clicks_idx = (header.index(col) for col in METRICS_COLUMNS)
+        width = max(date_idx, pv_idx, clicks_idx) + 1
+        rows: list[dict[str, str]] = []
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < width:
+                row = row + [""] * (width - len(row))
+            rows.append({"date": row[date_idx], "pv": row[pv_idx], "clicks": row[clicks_idx]})
+    # _upsert_row bisects on date, so a hand-edited file is put back in order here.
+    if any(prev["date"] > cur["date"] for prev, cur in zip(rows, rows[1:])):
+        rows.sort(key=lambda row: row["date"])
+    return rows
 
 
 def _write_rows(path: Path, rows: list[dict[str, str]]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w", encoding="utf-8", newline="") as fh:
-        writer = csv.DictWriter(fh, fieldnames=METRICS_COLUMNS)
-        writer.writeheader()
-        writer.writerows(rows)
+        writer = csv.writer(fh)
+        writer.writerow(METRICS_COLUMNS)
+        writer.writerows((row["date"], row["pv"], row["clicks"]) for row in rows)
 
 
 def _upsert_row(rows: list[dict[str, str]], date_key: str, pv: int, clicks: int) -> list[dict[str, str]]:
-    updated = False
-    new_rows: list[dict[str, str]] = []
-    for row in rows:
-        copied = dict(row)
-        if row.get("date") == date_key:
-            copied["pv"] = str(max(0, pv))
-            copied["clicks"] = str(max(0, clicks))
-            updated = True
-        new_rows.append(copied)
-    if not updated:
-        new_rows.append({"date": date_key, "pv": str(max(0, pv)), "clicks": str(max(0, clicks))})
-
-    def _sort_key(row: dict[str, str]) -> str:
-        return row.get("date", "")
+    # _load_rows hands back rows in date order, so the row for
+    # date_key is found (or its slot located) by binary search.
+    values = {"pv": str(max(0, pv)), "clicks": str(max(0, clicks))}
+    index = bisect.bisect_left(rows, date_key, key=lambda row: row.get("date", ""))
+    if index < len(rows) and rows[index].get("date") == date_key:
+        rows[index].update(values)
+    else:
+        rows.insert(index, {"date": date_key, **values})
+    return rows
 
-    return sorted(new_rows, key=_sort_key)
 
+def _fetch_ga4_range(
+    property_id: str, start: dt.date, end: dt.date
+) -> dict[str, tuple[int, int]] | None:
+    if not property_id:
+        return None
 
-def _fetch_ga4_day(property_id: str, day: dt.date) -> tuple[int, int] | None:
     try:
         from google.analytics.data_v1beta import BetaAnalyticsDataClient
         from google.analytics.data_v1beta.types import (
             DateRange,
             Dimension,
-            Filter,
-            FilterExpression,
             Metric,
             RunReportRequest,
         )
     except Exception:
         return None
 
-    if not property_id:
-        return None
-
     client = BetaAnalyticsDataClient()
 
-    pv_req = RunReportRequest(
+    # One report broken down by date and eventName: screenPageViews summed over a
+    # date's rows is that day's total, and its affiliate_click row carries the clicks.
+    request = RunReportRequest(
         property=f"properties/{property_id}",
-        date_ranges=[DateRange(start_date=day.isoformat(), end_date=day.isoformat())],
-        metrics=[Metric(name="screenPageViews")],
+        date_ranges=[DateRange(start_date=start.isoformat(), end_date=end.isoformat())],
+        dimensions=[Dimension(name="date"), Dimension(name="eventName")],
+        metrics=[Metric(name="screenPageViews"), Metric(name="eventCount")],
     )
-    pv_resp = client.run_report(pv_req)
-    pv_total = int(pv_resp.rows[0].metric_values[0].value) if pv_resp.rows else 0
+    response = client.run_report(request)
+    daily: dict[str, tuple[int, int]] = {}
+    for row in response.rows:
+        raw_date = row.dimension_values[0].value
+        date_key = f"{raw_date[:4]}-{raw_date[4:6]}-{raw_date[6:8]}"
+        pv, clicks = daily.get(date_key, (0, 0))
+        pv += int(row.metric_values[0].value)
+        if row.dimension_values[1].value == "affiliate_click":
+            clicks = int(row.metric_values[1].value)
+        daily[date_key] = (pv, clicks)
+    return daily
 
-    click_req = RunReportRequest(
-        property=f"properties/{property_id}",
-        date_ranges=[DateRange(start_date=day.isoformat(), end_date=day.isoformat())],
-        dimensions=[Dimension(name="eventName")],
-        metrics=[Metric(name="eventCount")],
-        dimension_filter=FilterExpression(
-            filter=Filter(
-                field_name="eventName",
-                string_filter=Filter.StringFilter(
-                    value="affiliate_click", match_type=Filter.StringFilter.MatchType.EXACT
-                ),
-            )
-        ),
-    )
-    click_resp = client.run_report(click_req)
-    clicks_total = int(click_resp.rows[0].metric_values[0].value) if click_resp.rows else 0
 
-    return pv_total, clicks_total
+def _fetch_ga4_day(property_id: str, day: dt.date) -> tuple[int, int] | None:
+    daily = _fetch_ga4_range(property_id, day, day)
+    if daily is None:
+        return None
+    return daily.get(day.isoformat(), (0, 0))
+
+
+def _missing_days(
+    rows: list[dict[str, str]], target_day: dt.date, backfill_days: int
+) -> list[dt.date]:
+    existing = {row.get("date", "") for row in rows}
+    missing: list[dt.date] = []
+    for offset in range(max(1, backfill_days) - 1, 0, -1):
+        day = target_day - dt.timedelta(days=offset)
+        if day.isoformat() not in existing:
+            missing.append(day)
+    return missing
 
 
 def cli() -> int:
@@ -108,6 +130,12 @@ def cli() -> int:
     parser.add_argument("--config", default="config/system.yaml")
     parser.add_argument("--metrics", default="data/analytics_metrics.csv")
     parser.add_argument("--date", default="", help="YYYY-MM-DD (default: yesterday JST)")
+    parser.add_argument(
+        "--backfill-days",
+        type=int,
+        default=1,
+        help="Also fill days missing from the CSV within this many days of --date (1: --date only)",
+    )
     args = parser.parse_args()
 
     config = load_system_config(args.config)
@@ -119,39 +147,48 @@ def cli() -> int:
     if args.date:
         target_day = dt.date.fromisoformat(args.date)
     else:
-        jst = dt.timezone(dt.timedelta(hours=9))
-        target_day = dt.datetime.now(jst).date() - dt.timedelta(days=1)
+        target_day = today_jst().date() - dt.timedelta(days=1)
 
-    ga4 = _fetch_ga4_day(property_id=property_id, day=target_day)
-    if ga4 is None:
+    metrics_path = resolve_path(args.metrics)
+    rows = _load_rows(metrics_path)
+    missing_days = _missing_days(rows, target_day, args.backfill_days)
+
+    # Gaps left by failed runs are filled from one multi-day report; otherwise
+    # only the target day is fetched.
+    if missing_days:
+        daily = _fetch_ga4_range(property_id, missing_days[0], target_day)
+    else:
+        ga4 = _fetch_ga4_day(property_id=property_id, day=target_day)
+        daily = None if ga4 is None else {target_day.isoformat(): ga4}
+
+    if daily is None:
         print(
-            json.dumps(
+            dump_json(
                 {
                     "skipped": True,
                     "reason": "ga4_unavailable_or_unconfigured",
                     "date": target_day.isoformat(),
-                },
-                ensure_ascii=False,
+                }
             )
         )
         return 0
 
-    pv, clicks = ga4
-    metrics_path = resolve_path(args.metrics)
-    rows = _load_rows(metrics_path)
-    merged = _upsert_row(rows, target_day.isoformat(), pv, clicks)
-    _write_rows(metrics_path, merged)
+    for day in [*missing_days, target_day]:
+        day_pv, day_clicks = daily.get(day.isoformat(), (0, 0))
+        rows = _upsert_row(rows, day.isoformat(), day_pv, day_clicks)
+    _write_rows(metrics_path, rows)
 
+    pv, clicks = daily.get(target_day.isoformat(), (0, 0))
     print(
-        json.dumps(
+        dump_json(
             {
                 "skipped": False,
                 "date": target_day.isoformat(),
                 "pv": pv,
                 "clicks": clicks,
+                "backfilled": [day.isoformat() for day in missing_days],
                 "file": str(metrics_path),
-            },
-            ensure_ascii=False,
+            }
         )
     )
     return 0
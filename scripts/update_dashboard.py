@@ -1,13 +1,13 @@
 from __future__ import annotations
 
 import argparse
-import csv
 import datetime as dt
-import re
+import io
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-
-import requests
+from typing import Any, TextIO
+from urllib.parse import urlparse
 
 if __package__ in {None, ""}:  # pragma: no cover
     import sys
@@ -15,14 +15,24 @@ if __package__ in {None, ""}:  # pragma: no cover
     sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from scripts.ad_revenue_validate import read_rows as read_ad_revenue_rows
-from scripts.ad_revenue_validate import sum_ad_revenue
-from scripts.common import dump_json, load_system_config, load_yaml, read_csv_rows, resolve_path
+from scripts.ad_revenue_validate import sum_ad_revenue_windows
+from scripts.common import (
+    ADSENSE_PUBLISHER_PATTERN,
+    GA4_MEASUREMENT_PATTERN,
+    dump_json,
+    http_ok,
+    is_affiliate_ready,
+    is_placeholder_url,
+    load_system_config,
+    load_yaml,
+    read_csv_rows,
+    resolve_path,
+    sum_metric_windows,
+    today_jst,
+)
 from scripts.monetization_audit import TOOLS_COLUMNS
 
-METRICS_COLUMNS = ["date", "pv", "clicks"]
-AFFILIATE_READY_STATUSES = {"approved", "active", "affiliate_ready"}
-ADSENSE_PUBLISHER_PATTERN = re.compile(r"^ca-pub-\d{16}$")
-GA4_MEASUREMENT_PATTERN = re.compile(r"^G-[A-Z0-9]+$")
+LOCAL_HOSTNAMES = {"localhost", "127.0.0.1", "::1"}
 
 
 @dataclass
@@ -32,51 +42,64 @@ class StatusItem:
     detail: str
 
 
-def _safe_int(value: str) -> int:
-    try:
-        return int(float(value))
-    except (ValueError, TypeError):
-        return 0
-
-
-def _load_metric_totals(path: Path, start_day: dt.date, end_day: dt.date) -> tuple[int, int]:
-    if not path.exists():
-        return 0, 0
-    pv_total = 0
-    clicks_total = 0
-    with path.open("r", encoding="utf-8", newline="") as fh:
-        reader = csv.DictReader(fh)
-        columns = reader.fieldnames or []
-        missing = [col for col in METRICS_COLUMNS if col not in columns]
-        if missing:
-            raise ValueError(f"{path} is missing required columns: {', '.join(missing)}")
-        for row in reader:
-            try:
-                day = dt.date.fromisoformat((row.get("date", "") or "").strip())
-            except ValueError:
-                continue
-            if start_day <= day <= end_day:
-                pv_total += _safe_int(row.get("pv", "0"))
-                clicks_total += _safe_int(row.get("clicks", "0"))
-    return pv_total, clicks_total
-
-
-def _is_placeholder_url(url: str) -> bool:
-    value = (url or "").strip().lower()
-    if not value:
-        return True
-    return any(
-        token in value
-        for token in ["example.com", "replace-me", "your-affiliate-link", "<", ">"]
+@dataclass
+class DashboardSummary:
+    tools_ready_count: int
+    tools_total_count: int
+    pv_7d: int
+    clicks_7d: int
+    affiliate_7d: float
+    adsense_7d: float
+    total_7d: float
+    pv_28d: int
+    clicks_28d: int
+    affiliate_28d: float
+    adsense_28d: float
+    total_28d: float
+    progress: float
+    passed: int
+    total: int
+
+
+def build_summary(
+    *,
+    tools_ready_count: int,
+    tools_total_count: int,
+    pv_7d: int,
+    clicks_7d: int,
+    adsense_7d: float,
+    pv_28d: int,
+    clicks_28d: int,
+    adsense_28d: float,
+    default_epc: float,
+    status_items: list[StatusItem],
+) -> DashboardSummary:
+    affiliate_7d = clicks_7d * default_epc
+    affiliate_28d = clicks_28d * default_epc
+    total_7d = affiliate_7d + adsense_7d
+    return DashboardSummary(
+        tools_ready_count=tools_ready_count,
+        tools_total_count=tools_total_count,
+        pv_7d=pv_7d,
+        clicks_7d=clicks_7d,
+        affiliate_7d=affiliate_7d,
+        adsense_7d=adsense_7d,
+        total_7d=total_7d,
+        pv_28d=pv_28d,
+        clicks_28d=clicks_28d,
+        affiliate_28d=affiliate_28d,
+        adsense_28d=adsense_28d,
+        total_28d=affiliate_28d + adsense_28d,
+        progress=min(999.0, total_7d / 7.0 / 1.0 * 100.0),
+        passed=sum(1 for item in status_items if item.passed),
+        total=len(status_items),
     )
 
 
-def _http_ok(url: str, timeout: int = 8) -> tuple[bool, str]:
-    try:
-        res = requests.get(url, timeout=timeout)
-        return (res.status_code < 400, f"HTTP {res.status_code}")
-    except Exception as exc:  # pragma: no cover
-        return (False, f"error: {type(exc).__name__}")
+def _is_live_checkable(base_url: str) -> bool:
+    # Placeholder and local sites can never answer from CI, so skip the probes.
+    hostname = urlparse(base_url).hostname or ""
+    return not is_placeholder_url(base_url) and hostname not in LOCAL_HOSTNAMES
 
 
 def _date_window(days: int, now: dt.date) -> tuple[dt.date, dt.date]:
@@ -88,115 +111,94 @@ def _format_usd(value: float) -> str:
     return f"${value:.2f}"
 
 
-def render_report_markdown(
+def write_report_markdown(
+    out: TextIO,
     *,
     now_jst: dt.datetime,
     base_url: str,
-    tools_ready_count: int,
-    tools_total_count: int,
-    pv_7d: int,
-    clicks_7d: int,
-    affiliate_7d: float,
-    adsense_7d: float,
-    total_7d: float,
-    pv_28d: int,
-    clicks_28d: int,
-    affiliate_28d: float,
-    adsense_28d: float,
-    total_28d: float,
+    summary: DashboardSummary,
     status_items: list[StatusItem],
-) -> str:
-    progress = min(999.0, total_7d / 7.0 / 1.0 * 100.0)
-    passed = sum(1 for item in status_items if item.passed)
-    total = len(status_items)
+) -> None:
     by_name = {item.name: item for item in status_items}
 
-    next_lines: list[str] = []
+    write = out.write
+    write("# Monetization Dashboard\n\n")
+    write(f"- 更新日時: {now_jst:%Y-%m-%d %H:%M JST}\n")
+    write(f"- サイト: {base_url}\n")
+    write(f"- 目標進捗（$1/日基準）: {summary.progress:.1f}%\n\n")
+    write("## Revenue (7 days)\n")
+    write(f"- PV: {summary.pv_7d}\n")
+    write(f"- Clicks: {summary.clicks_7d}\n")
+    write(f"- Affiliate推定: {_format_usd(summary.affiliate_7d)}\n")
+    write(f"- AdSense実績: {_format_usd(summary.adsense_7d)}\n")
+    write(f"- 合算: {_format_usd(summary.total_7d)}\n\n")
+    write("## Revenue (28 days)\n")
+    write(f"- PV: {summary.pv_28d}\n")
+    write(f"- Clicks: {summary.clicks_28d}\n")
+    write(f"- Affiliate推定: {_format_usd(summary.affiliate_28d)}\n")
+    write(f"- AdSense実績: {_format_usd(summary.adsense_28d)}\n")
+    write(f"- 合算: {_format_usd(summary.total_28d)}\n\n")
+    write("## Setup Status\n")
+    write(f"- 完了: {summary.passed}/{summary.total}\n")
+    write(f"- 収益化案件: {summary.tools_ready_count}/{summary.tools_total_count}\n")
+    for item in status_items:
+        mark = "x" if item.passed else " "
+        write(f"- [{mark}] {item.name}（{item.detail}）\n")
+
+    write("\n## Next\n")
+    has_next = False
     if not by_name.get("GA4 Measurement ID 設定", StatusItem("", False, "")).passed:
-        next_lines.append("- GA4 Measurement ID を `_config.yml` に設定する。")
+        write("- GA4 Measurement ID を `_config.yml` に設定する。\n")
+        has_next = True
     if not by_name.get("AdSense Publisher ID 設定", StatusItem("", False, "")).passed:
-        next_lines.append("- AdSense Publisher ID を `_config.yml` に設定する。")
+        write("- AdSense Publisher ID を `_config.yml` に設定する。\n")
+        has_next = True
     if not by_name.get("収益化リンク準備", StatusItem("", False, "")).passed:
-        next_lines.append("- `tools.csv` の `affiliate_url` と `status` を見直す。")
-    if not next_lines:
-        next_lines.append("- ID設定は完了済み。Search Console提出と流入改善を継続する。")
-    next_lines.append("- `data/ad_revenue.csv` を週1で更新する。")
-
-    lines = [
-        "# Monetization Dashboard",
-        "",
-        f"- 更新日時: {now_jst.strftime('%Y-%m-%d %H:%M JST')}",
-        f"- サイト: {base_url}",
-        f"- 目標進捗（$1/日基準）: {progress:.1f}%",
-        "",
-        "## Revenue (7 days)",
-        f"- PV: {pv_7d}",
-        f"- Clicks: {clicks_7d}",
-        f"- Affiliate推定: {_format_usd(affiliate_7d)}",
-        f"- AdSense実績: {_format_usd(adsense_7d)}",
-        f"- 合算: {_format_usd(total_7d)}",
-        "",
-        "## Revenue (28 days)",
-        f"- PV: {pv_28d}",
-        f"- Clicks: {clicks_28d}",
-        f"- Affiliate推定: {_format_usd(affiliate_28d)}",
-        f"- AdSense実績: {_format_usd(adsense_28d)}",
-        f"- 合算: {_format_usd(total_28d)}",
-        "",
-        "## Setup Status",
-        f"- 完了: {passed}/{total}",
-        f"- 収益化案件: {tools_ready_count}/{tools_total_count}",
-    ]
-    for item in status_items:
-        mark = "x" if item.passed else " "
-        lines.append(f"- [{mark}] {item.name}（{item.detail}）")
+        write("- `tools.csv` の `affiliate_url` と `status` を見直す。\n")
+        has_next = True
+    if not has_next:
+        write("- ID設定は完了済み。Search Console提出と流入改善を継続する。\n")
+    write("- `data/ad_revenue.csv` を週1で更新する。\n")
 
-    lines.extend(["", "## Next"] + next_lines)
-    return "\n".join(lines) + "\n"
 
+def render_report_markdown(**kwargs: Any) -> str:
+    buf = io.StringIO()
+    write_report_markdown(buf, **kwargs)
+    return buf.getvalue()
 
-def render_site_markdown(
+
+def write_site_markdown(
+    out: TextIO,
     *,
     now_jst: dt.datetime,
     base_url: str,
-    total_7d: float,
-    total_28d: float,
+    summary: DashboardSummary,
     status_items: list[StatusItem],
-) -> str:
-    passed = sum(1 for item in status_items if item.passed)
-    total = len(status_items)
-    lines = [
-        "---",
-        "layout: default",
-        'title: "収益ダッシュボード"',
-        "permalink: /dashboard/",
-        "---",
-        "",
-        "# 収益ダッシュボード",
-        "",
-        f"- 更新日時: {now_jst.strftime('%Y-%m-%d %H:%M JST')}",
-        f"- 7日合算収益: {_format_usd(total_7d)}",
-        f"- 28日合算収益: {_format_usd(total_28d)}",
-        f"- セットアップ進捗: {passed}/{total}",
-        "",
-        "## 現在の状態",
-    ]
+) -> None:
+    write = out.write
+    write('---\nlayout: default\ntitle: "収益ダッシュボード"\npermalink: /dashboard/\n---\n\n')
+    write("# 収益ダッシュボード\n\n")
+    write(f"- 更新日時: {now_jst:%Y-%m-%d %H:%M JST}\n")
+    write(f"- 7日合算収益: {_format_usd(summary.total_7d)}\n")
+    write(f"- 28日合算収益: {_format_usd(summary.total_28d)}\n")
+    write(f"- セットアップ進捗: {summary.passed}/{summary.total}\n\n")
+    write("## 現在の状態\n")
     for item in status_items:
         label = "完了" if item.passed else "未完了"
-        lines.append(f"- {item.name}: {label}（{item.detail}）")
-    lines.extend(
-        [
-            "",
-            "## 補足",
-            "- このページは自動更新です（Daily Publish / Weekly Report / Daily Metrics Sync）。",
-            "- 詳細ログはリポジトリの `reports/monetization-dashboard.md` を確認してください。",
-            f"- サイトURL: {base_url}",
-        ]
-    )
-    return "\n".join(lines) + "\n"
+        write(f"- {item.name}: {label}（{item.detail}）\n")
+    write("\n## 補足\n")
+    write("- このページは自動更新です（Daily Publish / Weekly Report / Daily Metrics Sync）。\n")
+    write("- 詳細ログはリポジトリの `reports/monetization-dashboard.md` を確認してください。\n")
+    write(f"- サイトURL: {base_url}\n")
 
 
-def cli() -> int:
+def render_site_markdown(**kwargs: Any) -> str:
+    buf = io.StringIO()
+    write_site_markdown(buf, **kwargs)
+    return buf.getvalue()
+
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Build monetization dashboard markdown")
     parser.add_argument("--config", default="config/system.yaml")
     parser.add_argument("--site-config", default="_config.yml")
@@ -206,8 +208,16 @@ def cli() -> int:
     parser.add_argument("--output-report", default="reports/monetization-dashboard.md")
     parser.add_argument("--output-site", default="content/dashboard.md")
     parser.add_argument("--no-live-check", action="store_true")
-    args = parser.parse_args()
+    parser.add_argument("--timeout", type=float, default=8, help="Live check timeout in seconds")
+    return parser
+
+
+def cli() -> int:
+    print(dump_json(run(build_parser().parse_args())))
+    return 0
 
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
     config = load_system_config(args.config)
     site_config = load_yaml(args.site_config)
     tools = read_csv_rows(args.tools, TOOLS_COLUMNS)
@@ -221,48 +231,44 @@ def cli() -> int:
     ad_revenue_default = str(config.get("reporting", {}).get("ad_revenue_csv", "data/ad_revenue.csv"))
     ad_revenue_path = resolve_path(args.ad_revenue or ad_revenue_default)
 
-    now_jst = dt.datetime.now(dt.timezone(dt.timedelta(hours=9)))
+    now_jst = today_jst()
     today = now_jst.date()
     start_7d, end_7d = _date_window(7, today)
     start_28d, end_28d = _date_window(28, today)
 
-    pv_7d, clicks_7d = _load_metric_totals(metrics_path, start_7d, end_7d)
-    pv_28d, clicks_28d = _load_metric_totals(metrics_path, start_28d, end_28d)
-    affiliate_7d = clicks_7d * default_epc
-    affiliate_28d = clicks_28d * default_epc
-
+    (pv_7d, clicks_7d), (pv_28d, clicks_28d) = sum_metric_windows(
+        metrics_path, [(start_7d, end_7d), (start_28d, end_28d)]
+    )
     adsense_7d = 0.0
     adsense_28d = 0.0
     ad_revenue_valid = False
     ad_revenue_detail = str(ad_revenue_path)
     try:
-        read_ad_revenue_rows(ad_revenue_path)
-        adsense_7d = sum_ad_revenue(ad_revenue_path, start_7d, end_7d)
-        adsense_28d = sum_ad_revenue(ad_revenue_path, start_28d, end_28d)
+        ad_revenue_rows = read_ad_revenue_rows(ad_revenue_path)
+        adsense_7d, adsense_28d = sum_ad_revenue_windows(
+            ad_revenue_rows, [(start_7d, end_7d), (start_28d, end_28d)]
+        )
         ad_revenue_valid = True
         ad_revenue_detail = f"{ad_revenue_path} (valid)"
     except ValueError as exc:
         ad_revenue_detail = f"{ad_revenue_path} ({exc})"
 
-    total_7d = affiliate_7d + adsense_7d
-    total_28d = affiliate_28d + adsense_28d
+    ready_tools = [row for row in tools if is_affiliate_ready(row)]
 
-    ready_tools = [
-        row
-        for row in tools
-        if row.get("status", "").strip().lower() in AFFILIATE_READY_STATUSES
-        and not _is_placeholder_url(row.get("affiliate_url", ""))
-    ]
+    workflows_dir = resolve_path(".github/workflows")
+    workflow_files = (
+        {path.name for path in workflows_dir.iterdir()} if workflows_dir.is_dir() else set()
+    )
 
     status_items: list[StatusItem] = [
         StatusItem(
             name="GA4 Measurement ID 設定",
-            passed=bool(GA4_MEASUREMENT_PATTERN.match(ga4_measurement_id)),
+            passed=bool(GA4_MEASUREMENT_PATTERN.fullmatch(ga4_measurement_id)),
             detail=ga4_measurement_id or "未設定",
         ),
         StatusItem(
             name="AdSense Publisher ID 設定",
-            passed=bool(ADSENSE_PUBLISHER_PATTERN.match(adsense_publisher_id)),
+            passed=bool(ADSENSE_PUBLISHER_PATTERN.fullmatch(adsense_publisher_id)),
             detail=adsense_publisher_id or "未設定",
         ),
         StatusItem(
@@ -277,20 +283,21 @@ def cli() -> int:
         ),
         StatusItem(
             name="Daily Publish workflow",
-            passed=resolve_path(".github/workflows/publish.yml").exists(),
+            passed="publish.yml" in workflow_files,
             detail=".github/workflows/publish.yml",
         ),
         StatusItem(
             name="Weekly Report workflow",
-            passed=resolve_path(".github/workflows/weekly_report.yml").exists(),
+            passed="weekly_report.yml" in workflow_files,
             detail=".github/workflows/weekly_report.yml",
         ),
     ]
 
-    if not args.no_live_check:
-        root_ok, root_detail = _http_ok(base_url)
-        sitemap_ok, sitemap_detail = _http_ok(f"{base_url}/sitemap.xml")
-        robots_ok, robots_detail = _http_ok(f"{base_url}/robots.txt")
+    if not args.no_live_check and _is_live_checkable(base_url):
+        urls = [base_url, f"{base_url}/sitemap.xml", f"{base_url}/robots.txt"]
+        with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+            results = list(pool.map(lambda url: http_ok(url, timeout=args.timeout), urls))
+        (root_ok, root_detail), (sitemap_ok, sitemap_detail), (robots_ok, robots_detail) = results
         status_items.extend(
             [
                 StatusItem("公開サイト到達", root_ok, root_detail),
@@ -299,51 +306,41 @@ def cli() -> int:
             ]
         )
 
-    report_markdown = render_report_markdown(
-        now_jst=now_jst,
-        base_url=base_url,
+    summary = build_summary(
         tools_ready_count=len(ready_tools),
         tools_total_count=len(tools),
         pv_7d=pv_7d,
         clicks_7d=clicks_7d,
-        affiliate_7d=affiliate_7d,
         adsense_7d=adsense_7d,
-        total_7d=total_7d,
         pv_28d=pv_28d,
         clicks_28d=clicks_28d,
-        affiliate_28d=affiliate_28d,
         adsense_28d=adsense_28d,
-        total_28d=total_28d,
-        status_items=status_items,
-    )
-    site_markdown = render_site_markdown(
-        now_jst=now_jst,
-        base_url=base_url,
-        total_7d=total_7d,
-        total_28d=total_28d,
+        default_epc=default_epc,
         status_items=status_items,
     )
-
     output_report = resolve_path(args.output_report)
     output_site = resolve_path(args.output_site)
     output_report.parent.mkdir(parents=True, exist_ok=True)
     output_site.parent.mkdir(parents=True, exist_ok=True)
-    output_report.write_text(report_markdown, encoding="utf-8")
-    output_site.write_text(site_markdown, encoding="utf-8")
-
-    print(
-        dump_json(
-            {
-                "output_report": str(output_report),
-                "output_site": str(output_site),
-                "total_revenue_7d_usd": round(total_7d, 4),
-                "total_revenue_28d_usd": round(total_28d, 4),
-                "ready_tools_count": len(ready_tools),
-                "tools_total_count": len(tools),
-            }
-        )
-    )
-    return 0
+    render_kwargs = {
+        "now_jst": now_jst,
+        "base_url": base_url,
+        "summary": summary,
+        "status_items": status_items,
+    }
+    with output_report.open("w", encoding="utf-8", buffering=1 << 16) as fh:
+        write_report_markdown(fh, **render_kwargs)
+    with output_site.open("w", encoding="utf-8", buffering=1 << 16) as fh:
+        write_site_markdown(fh, **render_kwargs)
+
+    return {
+        "output_report": str(output_report),
+        "output_site": str(output_site),
+        "total_revenue_7d_usd": round(summary.total_7d, 4),
+        "total_revenue_28d_usd": round(summary.total_28d, 4),
+        "ready_tools_count": len(ready_tools),
+        "tools_total_count": len(tools),
+    }
 
 
 if __name__ == "__main__":
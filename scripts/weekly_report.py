@@ -1,9 +1,7 @@
 from __future__ import annotations
 
 import argparse
-import csv
 import datetime as dt
-import json
 import os
 from pathlib import Path
 from typing import Any
@@ -13,105 +11,58 @@ if __package__ in {None, ""}:  # pragma: no cover
 
     sys.path.append(str(Path(__file__).resolve().parent.parent))
 
-from scripts.common import load_system_config, resolve_path, today_jst
+from scripts.common import (
+    dump_json,
+    load_system_config,
+    resolve_path,
+    sum_metric_windows,
+    today_jst,
+)
 from scripts.ad_revenue_validate import sum_ad_revenue
 
-METRICS_COLUMNS = ["date", "pv", "clicks"]
-
 
 def _date_range(end_day: dt.date, days: int = 7) -> tuple[dt.date, dt.date]:
     start_day = end_day - dt.timedelta(days=days - 1)
     return start_day, end_day
 
 
-def _safe_int(value: str) -> int:
-    try:
-        return int(float(value))
-    except (ValueError, TypeError):
-        return 0
-
-
-def _load_metrics_csv(path: Path, start_day: dt.date, end_day: dt.date) -> tuple[int, int]:
-    if not path.exists():
-        return 0, 0
-    pv_total = 0
-    clicks_total = 0
-    with path.open("r", encoding="utf-8", newline="") as fh:
-        reader = csv.DictReader(fh)
-        headers = reader.fieldnames or []
-        missing = [col for col in METRICS_COLUMNS if col not in headers]
-        if missing:
-            raise ValueError(f"{path} is missing columns: {', '.join(missing)}")
-        for row in reader:
-            date_str = row.get("date", "")
-            try:
-                day = dt.date.fromisoformat(date_str)
-            except ValueError:
-                continue
-            if start_day <= day <= end_day:
-                pv_total += _safe_int(row.get("pv", "0"))
-                clicks_total += _safe_int(row.get("clicks", "0"))
-    return pv_total, clicks_total
-
-
 def _fetch_ga4_metrics_if_available(
     *,
     start_day: dt.date,
     end_day: dt.date,
     property_id: str,
 ) -> tuple[int, int] | None:
+    if not property_id:
+        return None
+
     try:
         from google.analytics.data_v1beta import BetaAnalyticsDataClient
         from google.analytics.data_v1beta.types import (
             DateRange,
             Dimension,
-            Filter,
-            FilterExpression,
             Metric,
             RunReportRequest,
         )
     except Exception:
         return None
 
-    if not property_id:
-        return None
-
     client = BetaAnalyticsDataClient()
 
-    pageview_req = RunReportRequest(
-        property=f"properties/{property_id}",
-        date_ranges=[
-            DateRange(start_date=start_day.isoformat(), end_date=end_day.isoformat())
-        ],
-        metrics=[Metric(name="screenPageViews")],
-    )
-    pageview_resp = client.run_report(pageview_req)
-    pv_total = (
-        int(pageview_resp.rows[0].metric_values[0].value)
-        if pageview_resp.rows
-        else 0
-    )
-
-    click_req = RunReportRequest(
+    request = RunReportRequest(
         property=f"properties/{property_id}",
         date_ranges=[
             DateRange(start_date=start_day.isoformat(), end_date=end_day.isoformat())
         ],
         dimensions=[Dimension(name="eventName")],
-        metrics=[Metric(name="eventCount")],
-        dimension_filter=FilterExpression(
-            filter=Filter(
-                field_name="eventName",
-                string_filter=Filter.StringFilter(
-                    value="affiliate_click", match_type=Filter.StringFilter.MatchType.EXACT
-                ),
-            )
-        ),
-    )
-    click_resp = client.run_report(click_req)
-    clicks_total = (
-        int(click_resp.rows[0].metric_values[0].value) if click_resp.rows else 0
+        metrics=[Metric(name="screenPageViews"), Metric(name="eventCount")],
     )
+    response = client.run_report(request)
+    pv_total = 0
+    clicks_total = 0
+    for row in response.rows:
+        pv_total += int(row.metric_values[0].value)
+        if row.dimension_values[0].value == "affiliate_click":
+            clicks_total = int(row.metric_values[1].value)
     return pv_total, clicks_total
 
 
@@ -163,14 +114,21 @@ def write_report(path: Path, content: str) -> None:
     path.write_text(content, encoding="utf-8")
 
 
-def cli() -> int:
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Generate weekly KPI report")
     parser.add_argument("--config", default="config/system.yaml")
     parser.add_argument("--metrics", default="data/analytics_metrics.csv")
     parser.add_argument("--ad-revenue", default="")
     parser.add_argument("--reports-dir", default="reports")
-    args = parser.parse_args()
+    return parser
+
 
+def cli() -> int:
+    print(dump_json(run(build_parser().parse_args())))
+    return 0
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
     config = load_system_config(args.config)
     now = today_jst()
     end_day = now.date() - dt.timedelta(days=1)
@@ -190,7 +148,7 @@ def cli() -> int:
         traffic_source = "GA4 Data API"
     else:
         metrics_path = resolve_path(args.metrics)
-        pv_total, clicks_total = _load_metrics_csv(metrics_path, start_day, end_day)
+        [(pv_total, clicks_total)] = sum_metric_windows(metrics_path, [(start_day, end_day)])
         traffic_source = "data/analytics_metrics.csv"
 
     ad_revenue_default = str(
@@ -215,29 +173,23 @@ def cli() -> int:
     report_path = resolve_path(args.reports_dir) / f"weekly-{year}-{week:02d}.md"
     write_report(report_path, report)
 
-    print(
-        json.dumps(
-            {
-                "report": str(report_path),
-                "pv": pv_total,
-                "clicks": clicks_total,
-                "traffic_source": traffic_source,
-                "adsense_source": str(ad_revenue_path),
-                "affiliate_estimated_revenue_usd": round(
-                    clicks_total * float(config["affiliate"]["default_epc_usd"]), 4
-                ),
-                "adsense_revenue_usd": round(adsense_revenue, 4),
-                "total_revenue_usd": round(
-                    clicks_total * float(config["affiliate"]["default_epc_usd"])
-                    + adsense_revenue,
-                    4,
-                ),
-                "week": f"{year}-W{week:02d}",
-            },
-            ensure_ascii=False,
-        )
-    )
-    return 0
+    return {
+        "report": str(report_path),
+        "pv": pv_total,
+        "clicks": clicks_total,
+        "traffic_source": traffic_source,
+        "adsense_source": str(ad_revenue_path),
+        "affiliate_estimated_revenue_usd": round(
+            clicks_total * float(config["affiliate"]["default_epc_usd"]), 4
+        ),
+        "adsense_revenue_usd": round(adsense_revenue, 4),
+        "total_revenue_usd": round(
+            clicks_total * float(config["affiliate"]["default_epc_usd"])
+            + adsense_revenue,
+            4,
+        ),
+        "week": f"{year}-W{week:02d}",
+    }
 
 
 if __name__ == "__main__":
@@ -1,8 +1,122 @@
 from __future__ import annotations
 
+import datetime as dt
+import io
 import sys
+import tarfile
 from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+import yaml
 
 ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+FROZEN_NOW = dt.datetime(2026, 2, 14, 9, 0, tzinfo=dt.timezone(dt.timedelta(hours=9)))
+TODAY_JST_MODULES = (
+    "scripts.common",
+    "scripts.generate_article",
+    "scripts.monetization_audit",
+    "scripts.publish",
+    "scripts.search_console_checklist",
+    "scripts.sync_ga4_metrics",
+    "scripts.update_dashboard",
+    "scripts.weekly_report",
+)
+SYSTEM_CONFIG: dict[str, Any] = {
+    "site": {"base_url": "https://example.github.io/auto", "title": "Auto Revenue Lab"},
+    "content": {"language": "ja", "min_chars": 1400, "posts_per_run": 1},
+    "generation": {"provider": "huggingface_free", "model": "Qwen/Qwen2.5-7B-Instruct"},
+    "affiliate": {
+        "disclosure_text": "本記事には広告・アフィリエイトリンクが含まれます",
+        "default_epc_usd": 0.01,
+    },
+    "schedule": {"publish_cron_utc": "0 0 * * *", "weekly_report_cron_utc": "0 1 * * 1"},
+    "reporting": {"ad_revenue_csv": "data/ad_revenue.csv"},
+    "growth": {"min_keyword_pool": 10, "keyword_add_limit": 20},
+}
+SYSTEM_YAML_TEXT = yaml.safe_dump(SYSTEM_CONFIG, sort_keys=False, allow_unicode=True)
+SYSTEM_YAML_BYTES = SYSTEM_YAML_TEXT.encode("utf-8")
+BASE_TOOLS_CSV_BYTES = (
+    b"tool_id,name,category,official_url,affiliate_url,status,last_posted_at\n"
+    b"tool-1,Canva,design,https://www.canva.com,https://px.a8.net/svt/ejp?a8mat=TEST,approved,\n"
+)
+PROJECT_PATHS = {
+    "config": "config/system.yaml",
+    "site-config": "_config.yml",
+    "tools": "data/tools.csv",
+    "keywords": "data/keywords.csv",
+    "metrics": "data/analytics_metrics.csv",
+    "ad-revenue": "data/ad_revenue.csv",
+    "reports-dir": "reports",
+    "output-report": "reports/monetization-dashboard.md",
+    "output-site": "content/dashboard.md",
+}
+
+
+def _write_base_files(root: Path, publisher_id: str) -> None:
+    (root / "config").mkdir()
+    (root / "data").mkdir()
+
+    (root / "config" / "system.yaml").write_bytes(SYSTEM_YAML_BYTES)
+    (root / "_config.yml").write_text(
+        f'adsense_publisher_id: "{publisher_id}"\n',
+        encoding="utf-8",
+    )
+    (root / "data" / "tools.csv").write_bytes(BASE_TOOLS_CSV_BYTES)
+
+
+@pytest.fixture(autouse=True)
+def frozen_time(monkeypatch: pytest.MonkeyPatch) -> dt.datetime:
+    for module in TODAY_JST_MODULES:
+        monkeypatch.setattr(f"{module}.today_jst", lambda: FROZEN_NOW)
+    return FROZEN_NOW
+
+
+@pytest.fixture(scope="session")
+def system_yaml_text() -> str:
+    return SYSTEM_YAML_TEXT
+
+
+@pytest.fixture(scope="session")
+def system_config_dict() -> dict[str, Any]:
+    return SYSTEM_CONFIG
+
+
+@pytest.fixture(scope="session")
+def disclosure_text(system_config_dict: dict[str, Any]) -> str:
+    return system_config_dict["affiliate"]["disclosure_text"]
+
+
+@pytest.fixture(scope="session")
+def golden_tarball(tmp_path_factory: pytest.TempPathFactory) -> bytes:
+    root = tmp_path_factory.mktemp("golden")
+    _write_base_files(root, "")
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        tar.add(root, arcname="proj")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def project_root(golden_tarball: bytes, tmp_path: Path) -> Path:
+    with tarfile.open(fileobj=io.BytesIO(golden_tarball)) as tar:
+        tar.extractall(tmp_path, filter="data")
+    return tmp_path / "proj"
+
+
+@pytest.fixture(scope="session")
+def posts_dir_one(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    posts_dir = tmp_path_factory.mktemp("posts")
+    (posts_dir / f"{FROZEN_NOW.date().isoformat()}-ai-tool.md").write_text("x", encoding="utf-8")
+    return posts_dir
+
+
+@pytest.fixture(scope="session")
+def make_argv() -> Callable[..., list[str]]:
+    def _make_argv(root: Path, *flags: str) -> list[str]:
+        return [arg for flag in flags for arg in (f"--{flag}", str(root / PROJECT_PATHS[flag]))]
+
+    return _make_argv
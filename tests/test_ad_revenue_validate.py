@@ -5,7 +5,7 @@ from pathlib import Path
 
 import pytest
 
-from scripts.ad_revenue_validate import read_rows, sum_ad_revenue
+from scripts.ad_revenue_validate import read_rows, sum_ad_revenue, sum_ad_revenue_windows
 
 
 def test_read_rows_valid_csv(tmp_path: Path) -> None:
@@ -24,6 +24,28 @@ def test_read_rows_valid_csv(tmp_path: Path) -> None:
     assert total == pytest.approx(1.65)
 
 
+def test_sum_ad_revenue_windows_sums_each_window(tmp_path: Path) -> None:
+    csv_path = tmp_path / "ad_revenue.csv"
+    csv_path.write_text(
+        "date,adsense_revenue_usd,source,note\n"
+        "2026-01-20,2.00,adsense,old\n"
+        "2026-02-10,0.45,adsense,week1\n"
+        "2026-02-11,1.20,adsense,week1\n",
+        encoding="utf-8",
+    )
+
+    week, month = sum_ad_revenue_windows(
+        read_rows(csv_path),
+        [
+            (dt.date(2026, 2, 5), dt.date(2026, 2, 11)),
+            (dt.date(2026, 1, 15), dt.date(2026, 2, 11)),
+        ],
+    )
+
+    assert week == pytest.approx(1.65)
+    assert month == pytest.approx(3.65)
+
+
 def test_read_rows_missing_column_raises(tmp_path: Path) -> None:
     csv_path = tmp_path / "ad_revenue.csv"
     csv_path.write_text(
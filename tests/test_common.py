@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from scripts.common import dump_json, http_session, write_csv_rows
+
+
+def test_dump_json_keeps_non_ascii_and_indents() -> None:
+    assert dump_json({"title": "収益", "pv": 1}) == '{\n  "title": "収益",\n  "pv": 1\n}'
+
+
+def test_dump_json_rejects_dates() -> None:
+    with pytest.raises(TypeError):
+        dump_json({"date": dt.date(2026, 2, 14)})
+
+
+def test_write_csv_rows_removes_tmp_file_on_failure(tmp_path: Path) -> None:
+    target = tmp_path / "tools.csv"
+    target.write_bytes(b"tool_id,name\ntool-1,Canva\n")
+
+    with pytest.raises(AttributeError):
+        write_csv_rows(target, [{"tool_id": "tool-2"}, None], ["tool_id", "name"])
+
+    assert target.read_bytes() == b"tool_id,name\ntool-1,Canva\n"
+    assert list(tmp_path.iterdir()) == [target]
+
+
+def test_http_session_is_shared_across_threads() -> None:
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        sessions = list(pool.map(lambda _: http_session(), range(16)))
+
+    assert all(session is sessions[0] for session in sessions)
@@ -18,3 +18,4 @@ def test_tools_csv_missing_column_raises(tmp_path: Path) -> None:
 
     with pytest.raises(ValueError):
         read_csv_rows(csv_path, TOOLS_COLUMNS)
+
@@ -1,15 +1,17 @@
 from __future__ import annotations
 
+import datetime as dt
+
 from scripts.generate_article import generate_article, optimize_title_for_ctr
 
 
-def test_generate_article_fallback_contains_two_ctas() -> None:
+def test_generate_article_fallback_contains_two_ctas(disclosure_text: str) -> None:
     draft = generate_article(
         keyword="AI導入",
         intent="導入手順を確認したい",
         tool_name="ココナラ",
         cta_url="https://px.a8.net/svt/ejp?a8mat=TEST",
-        disclosure_text="本記事には広告・アフィリエイトリンクが含まれます",
+        disclosure_text=disclosure_text,
         min_chars=1400,
         model="Qwen/Qwen2.5-7B-Instruct",
         provider="huggingface_free",
@@ -19,7 +21,9 @@ def test_generate_article_fallback_contains_two_ctas() -> None:
     assert draft.body.count('rel="sponsored nofollow"') >= 2
 
 
-def test_optimize_title_for_ctr_limits_length_and_keeps_keyword() -> None:
+def test_optimize_title_for_ctr_limits_length_and_keeps_keyword(
+    frozen_time: dt.datetime,
+) -> None:
     title = optimize_title_for_ctr(
         title="長すぎる仮タイトル",
         keyword="AI導入 チェックリスト",
@@ -29,4 +33,5 @@ def test_optimize_title_for_ctr_limits_length_and_keeps_keyword() -> None:
     )
 
     assert "AI導入" in title
+    assert title.startswith(f"【{frozen_time.year}年版】")
     assert len(title) <= 48
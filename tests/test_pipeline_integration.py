@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-import csv
 import datetime as dt
 from pathlib import Path
+from typing import Any
 
-from scripts.common import load_system_config
+from scripts.common import read_csv_rows
 from scripts.publish import (
     KEYWORD_COLUMNS,
     TOOLS_COLUMNS,
@@ -18,100 +18,37 @@ from scripts.quality_gate import run_quality_gate
 from scripts.select_topic import select_topic
 
 
-def _write_csv(path: Path, fieldnames: list[str], rows: list[dict[str, str]]) -> None:
-    with path.open("w", encoding="utf-8", newline="") as fh:
-        writer = csv.DictWriter(fh, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+KEYWORDS_CSV_BYTES = (
+    "keyword,intent,priority,status,last_used_at\n"
+    "AI議事録 自動化,導入判断をしたい,10,new,\n"
+).encode("utf-8")
+TOOLS_CSV_BYTES = (
+    b"tool_id,name,category,official_url,affiliate_url,status,last_posted_at\n"
+    b"tool-1,Canva,design,https://www.canva.com,https://example.com/a8/canva,approved,\n"
+)
 
 
-def test_pipeline_select_generate_gate_publish(tmp_path: Path) -> None:
+def test_pipeline_select_generate_gate_publish(
+    tmp_path: Path,
+    system_config_dict: dict[str, Any],
+    frozen_time: dt.datetime,
+) -> None:
     root = tmp_path
-    (root / "config").mkdir()
     (root / "data").mkdir()
     posts_dir = root / "content" / "posts"
     posts_dir.mkdir(parents=True)
 
-    (root / "config" / "system.yaml").write_text(
-        """
-site:
-  base_url: "https://example.github.io/auto"
-  title: "Auto Revenue Lab"
-content:
-  language: "ja"
-  min_chars: 1400
-  posts_per_run: 1
-generation:
-  provider: "huggingface_free"
-  model: "Qwen/Qwen2.5-7B-Instruct"
-affiliate:
-  disclosure_text: "本記事には広告・アフィリエイトリンクが含まれます"
-  default_epc_usd: 0.01
-schedule:
-  publish_cron_utc: "0 0 * * *"
-  weekly_report_cron_utc: "0 1 * * 1"
-""".strip(),
-        encoding="utf-8",
-    )
+    (root / "data" / "keywords.csv").write_bytes(KEYWORDS_CSV_BYTES)
+    (root / "data" / "tools.csv").write_bytes(TOOLS_CSV_BYTES)
 
-    _write_csv(
-        root / "data" / "keywords.csv",
-        KEYWORD_COLUMNS,
-        [
-            {
-                "keyword": "AI議事録 自動化",
-                "intent": "導入判断をしたい",
-                "priority": "10",
-                "status": "new",
-                "last_used_at": "",
-            }
-        ],
-    )
-    _write_csv(
-        root / "data" / "tools.csv",
-        TOOLS_COLUMNS,
-        [
-            {
-                "tool_id": "tool-1",
-                "name": "Canva",
-                "category": "design",
-                "official_url": "https://www.canva.com",
-                "affiliate_url": "https://example.com/a8/canva",
-                "status": "approved",
-                "last_posted_at": "",
-            }
-        ],
-    )
-
-    config = load_system_config(root / "config" / "system.yaml")
-    topic = select_topic(
-        [
-            {
-                "keyword": "AI議事録 自動化",
-                "intent": "導入判断をしたい",
-                "priority": "10",
-                "status": "new",
-                "last_used_at": "",
-            }
-        ]
-    )
+    config = system_config_dict
+    topic = select_topic(read_csv_rows(root / "data" / "keywords.csv", KEYWORD_COLUMNS))
     assert topic is not None
 
-    tool = select_tool(
-        [
-            {
-                "tool_id": "tool-1",
-                "name": "Canva",
-                "category": "design",
-                "official_url": "https://www.canva.com",
-                "affiliate_url": "https://example.com/a8/canva",
-                "status": "approved",
-                "last_posted_at": "",
-            }
-        ]
-    )
+    tool = select_tool(read_csv_rows(root / "data" / "tools.csv", TOOLS_COLUMNS))
     cta_url = resolve_cta_url(tool)
 
+    assert cta_url == "https://www.canva.com"
     draft = generate_article(
         keyword=topic["keyword"],
         intent=topic["intent"],
@@ -124,10 +61,11 @@ schedule:
         force_template=True,
     )
 
-    slug = generate_unique_slug("ai-tool", posts_dir, date_prefix="2026-02-13")
+    date_prefix = frozen_time.date().isoformat()
+    slug = generate_unique_slug("ai-tool", posts_dir, date_prefix=date_prefix)
     markdown = build_post_markdown(
         title=draft.title,
-        now=dt.datetime(2026, 2, 13, 9, 0, 0),
+        now=frozen_time,
         slug=slug,
         keyword=topic["keyword"],
         intent=topic["intent"],
@@ -143,6 +81,6 @@ schedule:
     )
     assert gate.passed
 
-    output = posts_dir / "2026-02-13-ai-tool.md"
+    output = posts_dir / f"{date_prefix}-{slug}.md"
     output.write_text(markdown, encoding="utf-8")
     assert output.exists()
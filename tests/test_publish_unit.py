@@ -3,9 +3,11 @@ from __future__ import annotations
 import datetime as dt
 from pathlib import Path
 
-import pytest
+import yaml
 
 from scripts.publish import (
+    _update_tool_last_posted,
+    build_post_markdown,
     generate_unique_slug,
     reserve_unique_slug,
     resolve_cta_url,
@@ -14,18 +16,65 @@ from scripts.publish import (
 from scripts.quality_gate import run_quality_gate
 from scripts.common import slugify
 
+_TOOL_PENDING = {
+    "tool_id": "tool-001",
+    "name": "Pending Tool",
+    "category": "x",
+    "official_url": "https://official.example/a",
+    "affiliate_url": "https://example.com/a8/pending",
+    "status": "pending",
+    "last_posted_at": "2026-01-01",
+}
+_TOOL_APPROVED = {
+    "tool_id": "tool-002",
+    "name": "Approved Tool",
+    "category": "x",
+    "official_url": "https://official.example/b",
+    "affiliate_url": "https://a8.net/real-link",
+    "status": "approved",
+    "last_posted_at": "2026-02-01",
+}
+_TOOL_PLACEHOLDER = {
+    "tool_id": "tool-009",
+    "name": "Demo",
+    "category": "x",
+    "official_url": "https://official.example/demo",
+    "affiliate_url": "https://example.com/a8/demo",
+    "status": "approved",
+    "last_posted_at": "",
+}
+_SAME_DAY_ROWS = [
+    {
+        "tool_id": "tool-1",
+        "name": "A",
+        "category": "x",
+        "official_url": "https://official.example/a",
+        "affiliate_url": "https://a8.net/a",
+        "status": "approved",
+        "last_posted_at": "2026-02-10",
+    },
+    {
+        "tool_id": "tool-2",
+        "name": "B",
+        "category": "x",
+        "official_url": "https://official.example/b",
+        "affiliate_url": "https://a8.net/b",
+        "status": "approved",
+        "last_posted_at": "2026-02-10",
+    },
+]
 
-def test_generate_unique_slug_adds_suffix_when_duplicate(tmp_path: Path) -> None:
-    posts_dir = tmp_path / "content" / "posts"
-    posts_dir.mkdir(parents=True)
-    (posts_dir / "2026-02-13-ai-tool.md").write_text("x", encoding="utf-8")
 
-    slug = generate_unique_slug("ai-tool", posts_dir, date_prefix="2026-02-13")
+def test_generate_unique_slug_adds_suffix_when_duplicate(
+    posts_dir_one: Path, frozen_time: dt.datetime
+) -> None:
+    date_prefix = frozen_time.date().isoformat()
+    slug = generate_unique_slug("ai-tool", posts_dir_one, date_prefix=date_prefix)
 
     assert slug == "ai-tool-2"
 
 
-def test_quality_gate_fails_without_disclosure() -> None:
+def test_quality_gate_fails_without_disclosure(disclosure_text: str) -> None:
     text = """---
 layout: post
 ---
@@ -37,85 +86,48 @@ layout: post
     result = run_quality_gate(
         text=text,
         min_chars=10,
-        disclosure_text="本記事には広告・アフィリエイトリンクが含まれます",
+        disclosure_text=disclosure_text,
     )
 
     assert not result.passed
     assert any("広告表記文" in issue for issue in result.issues)
 
 
-def test_select_tool_prefers_affiliate_ready_real_link() -> None:
-    rows = [
-        {
-            "tool_id": "tool-001",
-            "name": "Pending Tool",
-            "category": "x",
-            "official_url": "https://official.example/a",
-            "affiliate_url": "https://example.com/a8/pending",
-            "status": "pending",
-            "last_posted_at": "2026-01-01",
-        },
-        {
-            "tool_id": "tool-002",
-            "name": "Approved Tool",
-            "category": "x",
-            "official_url": "https://official.example/b",
-            "affiliate_url": "https://a8.net/real-link",
-            "status": "approved",
-            "last_posted_at": "2026-02-01",
-        },
-    ]
+def test_quality_gate_fast_fail_stops_at_first_issue(disclosure_text: str) -> None:
+    result = run_quality_gate(
+        text="短い本文。[外部](https://example.com)",
+        min_chars=1400,
+        disclosure_text=disclosure_text,
+        fast_fail=True,
+    )
+
+    assert not result.passed
+    assert result.issues == ["広告表記文が本文に存在しません"]
+
 
-    selected = select_tool(rows)
+def test_select_tool_prefers_affiliate_ready_real_link() -> None:
+    selected = select_tool([_TOOL_PENDING, _TOOL_APPROVED])
     assert selected["tool_id"] == "tool-002"
     assert resolve_cta_url(selected) == "https://a8.net/real-link"
 
 
 def test_resolve_cta_url_falls_back_when_affiliate_is_placeholder() -> None:
-    tool = {
-        "tool_id": "tool-009",
-        "name": "Demo",
-        "category": "x",
-        "official_url": "https://official.example/demo",
-        "affiliate_url": "https://example.com/a8/demo",
-        "status": "approved",
-        "last_posted_at": "",
-    }
-    assert resolve_cta_url(tool) == "https://official.example/demo"
+    assert resolve_cta_url(_TOOL_PLACEHOLDER) == "https://official.example/demo"
 
 
 def test_select_tool_respects_excluded_ids() -> None:
-    rows = [
-        {
-            "tool_id": "tool-1",
-            "name": "A",
-            "category": "x",
-            "official_url": "https://official.example/a",
-            "affiliate_url": "https://a8.net/a",
-            "status": "approved",
-            "last_posted_at": "2026-02-10",
-        },
-        {
-            "tool_id": "tool-2",
-            "name": "B",
-            "category": "x",
-            "official_url": "https://official.example/b",
-            "affiliate_url": "https://a8.net/b",
-            "status": "approved",
-            "last_posted_at": "2026-02-10",
-        },
-    ]
-    selected = select_tool(rows, excluded_tool_ids={"tool-1"})
+    selected = select_tool(_SAME_DAY_ROWS, excluded_tool_ids={"tool-1"})
     assert selected["tool_id"] == "tool-2"
 
 
-def test_reserve_unique_slug_avoids_duplicate_in_same_run(tmp_path: Path) -> None:
-    posts_dir = tmp_path / "content" / "posts"
-    posts_dir.mkdir(parents=True)
+def test_reserve_unique_slug_avoids_duplicate_in_same_run(
+    posts_dir_one: Path, frozen_time: dt.datetime
+) -> None:
+    date_prefix = frozen_time.date().isoformat()
     reserved: set[str] = set()
 
-    first = reserve_unique_slug("ai", posts_dir, "2026-02-14", reserved)
-    second = reserve_unique_slug("ai", posts_dir, "2026-02-14", reserved)
+    first = reserve_unique_slug("ai", posts_dir_one, date_prefix, reserved)
+    second = reserve_unique_slug("ai", posts_dir_one, date_prefix, reserved)
 
     assert first == "ai"
     assert second == "ai-2"
@@ -124,3 +136,31 @@ def test_reserve_unique_slug_avoids_duplicate_in_same_run(tmp_path: Path) -> Non
 def test_slugify_non_ascii_uses_hash_prefix() -> None:
     slug = slugify("日本語 キーワード")
     assert slug.startswith("kw-")
+
+
+def test_build_post_markdown_escapes_quotes_and_backslashes(frozen_time: dt.datetime) -> None:
+    markdown = build_post_markdown(
+        title='C:\\path の "使い方"',
+        now=frozen_time,
+        slug="sample",
+        keyword="sample",
+        intent="test",
+        tool={"tool_id": "t1", "name": "Tool"},
+        cta_url="https://example.org/",
+        body="本文",
+    )
+    front_matter = yaml.safe_load(markdown.split("---\n")[1])
+    assert front_matter["title"] == 'C:\\path の "使い方"'
+
+
+def test_update_tool_last_posted_marks_every_duplicate_row(frozen_time: dt.datetime) -> None:
+    rows = [
+        {"tool_id": "t1", "last_posted_at": ""},
+        {"tool_id": "t2", "last_posted_at": ""},
+        {"tool_id": "t1", "last_posted_at": "2026-01-01"},
+    ]
+
+    updated = _update_tool_last_posted(rows, "t1", frozen_time)
+
+    posted_on = frozen_time.date().isoformat()
+    assert [row["last_posted_at"] for row in updated] == [posted_on, "", posted_on]
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
-from scripts.search_console_checklist import build_checks, render_markdown
+import pytest
 
+from scripts.search_console_checklist import CheckItem, build_checks, render_markdown
 
-def test_build_checks_includes_affiliate_ready_status() -> None:
+
+@pytest.fixture(scope="module")
+def checks() -> list[CheckItem]:
     config = {
         "site": {"base_url": "https://example.com"},
     }
@@ -20,22 +23,24 @@ def test_build_checks_includes_affiliate_ready_status() -> None:
         }
     ]
 
-    checks = build_checks(
+    return build_checks(
         config=config,
         site_config=site_config,
         tools=tools,
         live_check=False,
     )
-    assert any(
-        item.name == "収益化リンク(approved/active)が1件以上" and item.passed
-        for item in checks
-    )
-    assert any(
-        item.name == "Cookie同意バナー(同意前GA停止)が実装済み"
-        for item in checks
-    )
-    assert any(item.name == "AdSense Publisher ID 形式が妥当" for item in checks)
-    assert any(item.name == "同意後のみAdSense読込が実装済み" for item in checks)
+
+
+@pytest.fixture(scope="module")
+def checks_index(checks: list[CheckItem]) -> dict[str, CheckItem]:
+    return {item.name: item for item in checks}
+
+
+def test_build_checks_includes_affiliate_ready_status(checks_index: dict[str, CheckItem]) -> None:
+    assert checks_index["収益化リンク(approved/active)が1件以上"].passed
+    assert "Cookie同意バナー(同意前GA停止)が実装済み" in checks_index
+    assert "AdSense Publisher ID 形式が妥当" in checks_index
+    assert "同意後のみAdSense読込が実装済み" in checks_index
 
 
 def test_render_markdown_has_manual_steps() -> None:
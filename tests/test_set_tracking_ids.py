@@ -1,13 +1,19 @@
 from __future__ import annotations
 
+import argparse
+import io
+import json
+from contextlib import redirect_stdout
 from pathlib import Path
 
 import pytest
+import yaml
 
 from scripts.set_tracking_ids import cli as set_ids_cli
+from scripts.set_tracking_ids import run as set_ids_run
 
 
-def test_set_tracking_ids_updates_values(tmp_path: Path, monkeypatch, capsys) -> None:
+def test_set_tracking_ids_updates_values(tmp_path: Path, monkeypatch) -> None:
     config_path = tmp_path / "_config.yml"
     config_path.write_text(
         'title: "Auto Revenue Lab"\nga4_measurement_id: ""\nadsense_publisher_id: ""\n',
@@ -15,24 +21,13 @@ def test_set_tracking_ids_updates_values(tmp_path: Path, monkeypatch, capsys) ->
     )
 
     monkeypatch.chdir(tmp_path)
-    monkeypatch.setattr(
-        "sys.argv",
-        [
-            "set_tracking_ids.py",
-            "--config",
-            str(config_path),
-            "--ga4",
-            "G-TEST1234",
-            "--adsense",
-            "ca-pub-1234567890123456",
-        ],
+    payload = set_ids_run(
+        argparse.Namespace(
+            config=str(config_path), ga4="G-TEST1234", adsense="ca-pub-1234567890123456"
+        )
     )
-
-    rc = set_ids_cli()
-    assert rc == 0
-    out = capsys.readouterr().out
-    assert "G-TEST1234" in out
-    assert "ca-pub-1234567890123456" in out
+    assert payload["ga4_measurement_id"] == "G-TEST1234"
+    assert payload["adsense_publisher_id"] == "ca-pub-1234567890123456"
     content = config_path.read_text(encoding="utf-8")
     assert 'ga4_measurement_id: G-TEST1234' in content
     assert 'adsense_publisher_id: ca-pub-1234567890123456' in content
@@ -46,16 +41,64 @@ def test_set_tracking_ids_rejects_invalid_ids(tmp_path: Path, monkeypatch) -> No
     )
 
     monkeypatch.chdir(tmp_path)
+    with pytest.raises(ValueError):
+        set_ids_run(argparse.Namespace(config=str(config_path), ga4="BAD", adsense=""))
+
+
+def test_set_tracking_ids_preserves_other_lines(tmp_path: Path) -> None:
+    config_path = tmp_path / "_config.yml"
+    original = '# site settings\ntitle: "Auto Revenue Lab"\nga4_measurement_id: ""\nexclude:\n- data\n'
+    config_path.write_text(original, encoding="utf-8")
+
+    args = argparse.Namespace(config=str(config_path), ga4="G-TEST1234", adsense="")
+    set_ids_run(args)
+    assert config_path.read_text(encoding="utf-8") == (
+        original.replace('ga4_measurement_id: ""', "ga4_measurement_id: G-TEST1234")
+    )
+
+
+@pytest.mark.parametrize(
+    "original",
+    [
+        'ga4_measurement_id: |\n  G-OLD\n  kept\nadsense_publisher_id: ""\n',
+        'site: {ga4_measurement_id: "G-OLD"}\nga4_measurement_id: >\n  G-OLD\n',
+        '{title: "Auto Revenue Lab", ga4_measurement_id: ""}\n',
+    ],
+    ids=["block_scalar", "folded_scalar", "flow_mapping"],
+)
+def test_set_tracking_ids_round_trips_non_plain_values(tmp_path: Path, original: str) -> None:
+    config_path = tmp_path / "_config.yml"
+    config_path.write_text(original, encoding="utf-8")
+
+    set_ids_run(argparse.Namespace(config=str(config_path), ga4="G-TEST1234", adsense=""))
+
+    expected = {**yaml.safe_load(original), "ga4_measurement_id": "G-TEST1234"}
+    assert yaml.safe_load(config_path.read_text(encoding="utf-8")) == expected
+
+
+def test_set_tracking_ids_reports_values_as_yaml_reads_them(tmp_path: Path) -> None:
+    config_path = tmp_path / "_config.yml"
+    config_path.write_text(
+        'ga4_measurement_id: "G-A #1"  # comment\nadsense_publisher_id: ~\n', encoding="utf-8"
+    )
+
+    payload = set_ids_run(argparse.Namespace(config=str(config_path), ga4="", adsense=""))
+
+    assert payload["ga4_measurement_id"] == "G-A #1"
+    assert payload["adsense_publisher_id"] is None
+
+
+def test_set_tracking_ids_cli_prints_summary(tmp_path: Path, monkeypatch) -> None:
+    config_path = tmp_path / "_config.yml"
+    config_path.write_text('ga4_measurement_id: ""\nadsense_publisher_id: ""\n', encoding="utf-8")
+
     monkeypatch.setattr(
         "sys.argv",
-        [
-            "set_tracking_ids.py",
-            "--config",
-            str(config_path),
-            "--ga4",
-            "BAD",
-        ],
+        ["set_tracking_ids.py", "--config", str(config_path), "--ga4", "G-TEST1234"],
     )
+    buf = io.StringIO()
+    with redirect_stdout(buf):
+        rc = set_ids_cli()
 
-    with pytest.raises(ValueError):
-        set_ids_cli()
+    assert rc == 0
+    assert json.loads(buf.getvalue())["ga4_measurement_id"] == "G-TEST1234"
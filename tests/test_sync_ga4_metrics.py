@@ -1,24 +1,134 @@
 from __future__ import annotations
 
+import datetime as dt
+import sys
+import types
 from pathlib import Path
+from types import SimpleNamespace
 
-from scripts.sync_ga4_metrics import _upsert_row
+import pytest
 
+from scripts.sync_ga4_metrics import (
+    _fetch_ga4_range,
+    _load_rows,
+    _missing_days,
+    _upsert_row,
+)
 
-def test_upsert_row_updates_existing() -> None:
+
+def _report_row(date: str, event: str, pv: int, count: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        dimension_values=[SimpleNamespace(value=date), SimpleNamespace(value=event)],
+        metric_values=[SimpleNamespace(value=str(pv)), SimpleNamespace(value=str(count))],
+    )
+
+
+@pytest.fixture
+def ga4_client(monkeypatch: pytest.MonkeyPatch) -> list[dict]:
+    requests: list[dict] = []
+    report_rows = [
+        _report_row("20260211", "page_view", 40, 40),
+        _report_row("20260211", "affiliate_click", 0, 3),
+        _report_row("20260211", "scroll", 2, 9),
+        _report_row("20260212", "page_view", 50, 50),
+    ]
+
+    class FakeClient:
+        def run_report(self, request: dict) -> SimpleNamespace:
+            requests.append(request)
+            return SimpleNamespace(rows=report_rows)
+
+    data_module = types.ModuleType("google.analytics.data_v1beta")
+    data_module.BetaAnalyticsDataClient = FakeClient
+    types_module = types.ModuleType("google.analytics.data_v1beta.types")
+    for name in ("DateRange", "Dimension", "Metric", "RunReportRequest"):
+        setattr(types_module, name, lambda **kwargs: kwargs)
+    monkeypatch.setitem(sys.modules, "google", types.ModuleType("google"))
+    monkeypatch.setitem(sys.modules, "google.analytics", types.ModuleType("google.analytics"))
+    monkeypatch.setitem(sys.modules, "google.analytics.data_v1beta", data_module)
+    monkeypatch.setitem(sys.modules, "google.analytics.data_v1beta.types", types_module)
+    return requests
+
+
+@pytest.mark.parametrize(
+    ("rows", "date_key", "pv", "clicks", "expected"),
+    [
+        (
+            [
+                {"date": "2026-02-10", "pv": "10", "clicks": "1"},
+                {"date": "2026-02-11", "pv": "12", "clicks": "2"},
+            ],
+            "2026-02-11",
+            30,
+            7,
+            {"date": "2026-02-11", "pv": "30", "clicks": "7"},
+        ),
+        (
+            [{"date": "2026-02-10", "pv": "10", "clicks": "1"}],
+            "2026-02-12",
+            5,
+            0,
+            {"date": "2026-02-12", "pv": "5", "clicks": "0"},
+        ),
+    ],
+    ids=["updates_existing", "inserts_new"],
+)
+def test_upsert_row(
+    rows: list[dict[str, str]], date_key: str, pv: int, clicks: int, expected: dict[str, str]
+) -> None:
+    merged = _upsert_row(rows, date_key, pv, clicks)
+
+    assert expected in merged
+
+
+def test_upsert_row_keeps_date_order() -> None:
+    rows = [
+        {"date": "2026-02-10", "pv": "10", "clicks": "1"},
+        {"date": "2026-02-12", "pv": "12", "clicks": "2"},
+    ]
+
+    merged = _upsert_row(rows, "2026-02-11", 11, 1)
+
+    assert [r["date"] for r in merged] == ["2026-02-10", "2026-02-11", "2026-02-12"]
+
+
+def test_upsert_row_after_loading_out_of_order_file(tmp_path: Path) -> None:
+    metrics_path = tmp_path / "analytics_metrics.csv"
+    metrics_path.write_bytes(
+        b"date,pv,clicks\n"
+        b"2026-02-12,12,2\n"
+        b"2026-02-10,10,1\n"
+        b"2026-02-11,11,1\n"
+    )
+
+    merged = _upsert_row(_load_rows(metrics_path), "2026-02-10", 20, 3)
+
+    assert [r["date"] for r in merged] == ["2026-02-10", "2026-02-11", "2026-02-12"]
+    assert merged[0] == {"date": "2026-02-10", "pv": "20", "clicks": "3"}
+
+
+def test_missing_days_lists_gaps_before_target() -> None:
     rows = [
         {"date": "2026-02-10", "pv": "10", "clicks": "1"},
-        {"date": "2026-02-11", "pv": "12", "clicks": "2"},
+        {"date": "2026-02-12", "pv": "12", "clicks": "2"},
     ]
 
-    merged = _upsert_row(rows, "2026-02-11", 30, 7)
+    missing = _missing_days(rows, dt.date(2026, 2, 13), backfill_days=4)
+
+    assert missing == [dt.date(2026, 2, 11)]
 
-    assert any(r["date"] == "2026-02-11" and r["pv"] == "30" and r["clicks"] == "7" for r in merged)
 
+def test_fetch_ga4_range_sums_pv_and_picks_affiliate_clicks(ga4_client: list[dict]) -> None:
+    daily = _fetch_ga4_range("123", dt.date(2026, 2, 11), dt.date(2026, 2, 12))
 
-def test_upsert_row_inserts_new() -> None:
-    rows = [{"date": "2026-02-10", "pv": "10", "clicks": "1"}]
+    assert daily == {"2026-02-11": (42, 3), "2026-02-12": (50, 0)}
+    assert len(ga4_client) == 1
+    assert ga4_client[0]["property"] == "properties/123"
+    assert ga4_client[0]["date_ranges"] == [
+        {"start_date": "2026-02-11", "end_date": "2026-02-12"}
+    ]
 
-    merged = _upsert_row(rows, "2026-02-12", 5, 0)
 
-    assert any(r["date"] == "2026-02-12" and r["pv"] == "5" and r["clicks"] == "0" for r in merged)
+def test_fetch_ga4_range_skips_without_property_id(ga4_client: list[dict]) -> None:
+    assert _fetch_ga4_range("", dt.date(2026, 2, 11), dt.date(2026, 2, 12)) is None
+    assert ga4_client == []
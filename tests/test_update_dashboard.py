@@ -1,15 +1,15 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
 
-from scripts.update_dashboard import cli as dashboard_cli
+from scripts.update_dashboard import build_parser
+from scripts.update_dashboard import run as dashboard_run
 
 
-def test_update_dashboard_generates_report_and_site(tmp_path: Path, monkeypatch, capsys) -> None:
-    root = tmp_path
-    (root / "config").mkdir()
-    (root / "data").mkdir()
+def test_update_dashboard_generates_report_and_site(
+    project_root: Path, monkeypatch, make_argv
+) -> None:
+    root = project_root
     (root / "content").mkdir()
     (root / ".github" / "workflows").mkdir(parents=True)
 
@@ -18,38 +18,10 @@ def test_update_dashboard_generates_report_and_site(tmp_path: Path, monkeypatch,
         "name: y\n", encoding="utf-8"
     )
 
-    (root / "config" / "system.yaml").write_text(
-        """
-site:
-  base_url: "https://example.com"
-  title: "Auto Revenue Lab"
-content:
-  language: "ja"
-  min_chars: 1400
-  posts_per_run: 1
-generation:
-  provider: "huggingface_free"
-  model: "Qwen/Qwen2.5-7B-Instruct"
-affiliate:
-  disclosure_text: "本記事には広告・アフィリエイトリンクが含まれます"
-  default_epc_usd: 0.01
-schedule:
-  publish_cron_utc: "0 0 * * *"
-  weekly_report_cron_utc: "0 1 * * 1"
-reporting:
-  ad_revenue_csv: "data/ad_revenue.csv"
-""".strip(),
-        encoding="utf-8",
-    )
     (root / "_config.yml").write_text(
         'ga4_measurement_id: "G-TEST1234"\nadsense_publisher_id: "ca-pub-1234567890123456"\n',
         encoding="utf-8",
     )
-    (root / "data" / "tools.csv").write_text(
-        "tool_id,name,category,official_url,affiliate_url,status,last_posted_at\n"
-        "tool-1,Canva,design,https://www.canva.com,https://px.a8.net/svt/ejp?a8mat=TEST,approved,\n",
-        encoding="utf-8",
-    )
     (root / "data" / "analytics_metrics.csv").write_text(
         "date,pv,clicks\n2026-02-12,100,3\n2026-02-13,120,2\n",
         encoding="utf-8",
@@ -60,32 +32,23 @@ reporting:
     )
 
     monkeypatch.chdir(root)
-    monkeypatch.setattr(
-        "sys.argv",
-        [
-            "update_dashboard.py",
-            "--config",
-            str(root / "config" / "system.yaml"),
-            "--site-config",
-            str(root / "_config.yml"),
-            "--tools",
-            str(root / "data" / "tools.csv"),
-            "--metrics",
-            str(root / "data" / "analytics_metrics.csv"),
-            "--ad-revenue",
-            str(root / "data" / "ad_revenue.csv"),
-            "--output-report",
-            str(root / "reports" / "monetization-dashboard.md"),
-            "--output-site",
-            str(root / "content" / "dashboard.md"),
-            "--no-live-check",
-        ],
+    payload = dashboard_run(
+        build_parser().parse_args(
+            [
+                *make_argv(
+                    root,
+                    "config",
+                    "site-config",
+                    "tools",
+                    "metrics",
+                    "ad-revenue",
+                    "output-report",
+                    "output-site",
+                ),
+                "--no-live-check",
+            ]
+        )
     )
-
-    rc = dashboard_cli()
-    assert rc == 0
-
-    payload = json.loads(capsys.readouterr().out)
     assert payload["ready_tools_count"] == 1
     assert payload["total_revenue_7d_usd"] >= 0.5
 